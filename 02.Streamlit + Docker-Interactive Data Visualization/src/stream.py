@@ -1,6 +1,5 @@
-from collections import namedtuple
 import altair as alt
-import math
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -15,24 +14,61 @@ forums](https://discuss.streamlit.io).
 In the meantime, below is an example of what you can do with just a few lines of code:
 """
 
+# Above this many points the browser gets a downsampled view instead of every point
+MAX_RENDERED_POINTS = 5000
+
+# Bins per axis when the spiral is rendered as a density grid
+DENSITY_BINS = 100
+
+
+@st.cache_resource(max_entries=8)
+def spiral(total_points, num_turns):
+   """Return the x and y coordinates of the spiral as float32 arrays (cached per argument pair)."""
+   points_per_turn = total_points / num_turns
+   curr_point_num = np.arange(total_points)
+   curr_turn, i = np.divmod(curr_point_num, points_per_turn)
+   angle = (curr_turn + 1) * 2 * np.pi * i / points_per_turn
+   radius = curr_point_num / total_points
+   return (radius * np.cos(angle)).astype(np.float32), (radius * np.sin(angle)).astype(np.float32)
+
+
+def decimate(x, y, max_points=MAX_RENDERED_POINTS):
+   """Keep every n-th point so that at most max_points remain."""
+   step = -(-len(x) // max_points)
+   return pd.DataFrame({'x': x[::step], 'y': y[::step]})
+
+
+def bin_points(x, y, bins=DENSITY_BINS):
+   """Count points on a bins x bins grid; only non-empty cells are returned."""
+   counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[[-1, 1], [-1, 1]])
+   ix, iy = np.nonzero(counts)
+   return pd.DataFrame({
+      'x': (x_edges[ix] + x_edges[ix + 1]) / 2,
+      'y': (y_edges[iy] + y_edges[iy + 1]) / 2,
+      'count': counts[ix, iy].astype(np.int64),
+   })
+
+
 with st.echo(code_location='below'):
-   total_points = st.slider("Number of points in spiral", 1, 5000, 2000)
+   total_points = st.slider("Number of points in spiral", 1, 5_000_000, 2000)
    num_turns = st.slider("Number of turns in spiral", 1, 100, 9)
 
-   Point = namedtuple('Point', 'x y')
-   data = []
+   x, y = spiral(total_points, num_turns)
 
-   points_per_turn = total_points / num_turns
+   if total_points <= MAX_RENDERED_POINTS:
+      chart = alt.Chart(pd.DataFrame({'x': x, 'y': y}), height=500, width=500) \
+         .mark_circle(color='#0068c9', opacity=0.5) \
+         .encode(x='x:Q', y='y:Q')
+   elif st.radio("Level of detail", ("Decimate", "Density bins"), horizontal=True) == "Decimate":
+      chart = alt.Chart(decimate(x, y), height=500, width=500) \
+         .mark_circle(color='#0068c9', opacity=0.5) \
+         .encode(x='x:Q', y='y:Q')
+   else:
+      chart = alt.Chart(bin_points(x, y), height=500, width=500) \
+         .mark_square(color='#0068c9') \
+         .encode(x='x:Q', y='y:Q', opacity=alt.Opacity('count:Q', scale=alt.Scale(type='log')),
+                 tooltip=['count:Q'])
 
-   for curr_point_num in range(total_points):
-      curr_turn, i = divmod(curr_point_num, points_per_turn)
-      angle = (curr_turn + 1) * 2 * math.pi * i / points_per_turn
-      radius = curr_point_num / total_points
-      x = radius * math.cos(angle)
-      y = radius * math.sin(angle)
-      data.append(Point(x, y))
-
-   st.altair_chart(alt.Chart(pd.DataFrame(data), height=500, width=500)
-      .mark_circle(color='#0068c9', opacity=0.5)
-      .encode(x='x:Q', y='y:Q'))
-   
\ No newline at end of file
+   if total_points > MAX_RENDERED_POINTS:
+      st.caption(f"Showing a downsampled view of {total_points:,} points.")
+   st.altair_chart(chart)
@@ -1,10 +1,12 @@
+import os
+import threading
+from collections import OrderedDict
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
+import matplotlib.pyplot as plt
 from sklearn.svm import SVC
-from sklearn.metrics import precision_score, recall_score
-from sklearn.metrics import confusion_matrix
 from sklearn.metrics import ConfusionMatrixDisplay as plot_confusion_matrix
 
 from sklearn.linear_model import LogisticRegression
@@ -13,6 +15,163 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import RocCurveDisplay as plot_roc_curve
 from sklearn.metrics import PrecisionRecallDisplay as plot_precision_recall_curve
 
+from preprocess import load_split
+
+# Seed of the train/test split; part of every fitted-model cache key
+SPLIT_SEED = 0
+
+# Memory budget for fitted models and their evaluation results
+MODEL_CACHE_MB = float(os.environ.get("MODEL_CACHE_MB", 512))
+
+
+def estimate_bytes(obj, seen = None):
+    """
+    Approximate the memory held by obj as the nbytes of every NumPy array reachable from it.
+
+    Fitted estimators keep their state in arrays (forests through the node and
+    value arrays of each tree_), so this is close to the real size without
+    copying anything.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    seen = set() if seen is None else seen
+    if id(obj) in seen or obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, dict):
+        values = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        values = obj
+    else:
+        # Estimators and sklearn trees expose their arrays through their pickled state;
+        # the state is a temporary, so it is walked directly rather than tracked in seen
+        state = obj.__getstate__() if hasattr(obj, "__getstate__") else None
+        values = state.values() if isinstance(state, dict) else []
+    return sum(estimate_bytes(value, seen) for value in values)
+
+
+class FittedModelCache:
+    """LRU cache of fitted models and their evaluation, bounded by total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, result):
+        size = estimate_bytes(result)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.total_bytes += size
+            # Evict least recently used entries, but always keep the newest one
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted_size) = self.entries.popitem(last = False)
+                self.total_bytes -= evicted_size
+
+
+@st.cache_resource
+def get_model_cache():
+    """One cache shared by all sessions of the app."""
+    return FittedModelCache(int(MODEL_CACHE_MB * 2 ** 20))
+
+
+def build_model(classifier, params):
+    if classifier == "Support Vector Machine (SVM)":
+        return SVC(C = params["C"], kernel = params["kernel"], gamma = params["gamma"])
+    if classifier == "Logistic Regression":
+        return LogisticRegression(C = params["C"], max_iter = params["max_iter"])
+    return RandomForestClassifier(n_estimators = params["n_estimators"], max_depth = params["max_depth"],
+                                  bootstrap = params["bootstrap"] == 'True', n_jobs = -1)
+
+
+def evaluate_scores(y_true, y_score, threshold):
+    """
+    Derive every metric from a single score vector with one sorted threshold sweep.
+
+    Args:
+        y_true: Binary labels (0/1)
+        y_score: decision_function values or positive-class probabilities
+        threshold: Score above which a sample is predicted positive
+
+    Returns:
+        dict: accuracy, precision, recall, confusion matrix, ROC and PR curve arrays
+    """
+    y_true = np.asarray(y_true) == 1
+    y_score = np.asarray(y_score, dtype = float)
+
+    # Cumulative true/false positives when predicting positive down to each distinct score
+    order = np.argsort(-y_score, kind = "mergesort")
+    score_sorted = y_score[order]
+    tps_all = np.cumsum(y_true[order])
+    last = np.r_[np.flatnonzero(np.diff(score_sorted)), len(y_score) - 1]
+    tps = tps_all[last]
+    fps = last + 1 - tps
+    positives, negatives = tps_all[-1], len(y_true) - tps_all[-1]
+
+    fpr = np.r_[0, fps / negatives]
+    tpr = np.r_[0, tps / positives]
+    precision_curve = np.r_[1, tps / (tps + fps)]
+    recall_curve = tpr
+
+    # Operating point: samples scoring strictly above the threshold are positive
+    n_above = np.searchsorted(-score_sorted, -threshold, side = "left")
+    tp = int(tps_all[n_above - 1]) if n_above else 0
+    fp = n_above - tp
+    fn = positives - tp
+    tn = negatives - fp
+    cm = np.array([[tn, fp], [fn, tp]])
+
+    return {
+        "accuracy": (tp + tn) / len(y_true),
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / positives if positives else 0.0,
+        "confusion_matrix": cm,
+        "roc": {"fpr": fpr, "tpr": tpr, "auc": np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)},
+        "pr": {"precision": precision_curve, "recall": recall_curve,
+               "average_precision": np.sum(np.diff(recall_curve) * precision_curve[1:])},
+    }
+
+
+def fit_and_evaluate(classifier, params, data):
+    """
+    Fit a classifier and evaluate it on the test split, reusing a cached result
+    when the same classifier, hyperparameters, dataset and split seed were used before.
+
+    The model scores x_test exactly once; predictions, metrics and curves are
+    all derived from that score vector.
+
+    Returns:
+        dict: model, y_score and the metrics of evaluate_scores
+    """
+    cache = get_model_cache()
+    # data["key"] identifies the CSV content and the split seed
+    key = (classifier, tuple(sorted(params.items())), data["key"])
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    model = build_model(classifier, params)
+    model.fit(data["x_train"], data["y_train"])
+    # predict() is decision_function > 0 (SVM, Logistic Regression) or probability > 0.5 (Random Forest)
+    if hasattr(model, "decision_function"):
+        y_score, threshold = model.decision_function(data["x_test"]), 0.0
+    else:
+        y_score, threshold = model.predict_proba(data["x_test"])[:, 1], 0.5
+
+    result = {"model": model, "y_score": y_score, **evaluate_scores(data["y_test"], y_score, threshold)}
+    cache.put(key, result)
+    return result
+
 
 def main():
     st.title("Binary Classification WebApp")    
@@ -21,43 +180,39 @@ def main():
     st.sidebar.title("Binary Classification")
     st.sidebar.markdown("Are your mushroom edible or poisonous?")
 
-    @st.cache(persist = True)
-    def load_data():
-        data = pd.read_csv('mushrooms.csv')
-        label = LabelEncoder()
+    def show_figure(display):
+        fig, ax = plt.subplots()
+        display.plot(ax = ax)
+        st.pyplot(fig)
+        plt.close(fig)
 
-        for col in data.columns:
-            data[col] = label.fit_transform(data[col])
-        
-        return data
-
-    @st.cache(persist = True)
-    def split(df):
-        y = df.type
-        x = df.drop(columns = ['type'])
-        x_train, x_test, y_train, y_test = train_test_split(x, y, test_size = 0.3, random_state = 0)
-
-        return x_train, x_test, y_train, y_test
-    
-    def plot_metrics(metrics_list, y_pred):
+    def plot_metrics(metrics_list, result):
+        name = type(result["model"]).__name__
         if 'Confusion Matrix' in metrics_list:
             st.subheader("Confusion Matrix")
-            cm = confusion_matrix(y_test, y_pred)
-            plot_confusion_matrix(confusion_matrix=cm).plot()
-            st.pyplot()
+            show_figure(plot_confusion_matrix(confusion_matrix = result["confusion_matrix"], display_labels = class_names))
 
         if 'ROC Curve' in metrics_list:
             st.subheader("ROC Curve")
-            plot_roc_curve.from_estimator(model, x_test, y_test)
-            st.pyplot()
+            roc = result["roc"]
+            show_figure(plot_roc_curve(fpr = roc["fpr"], tpr = roc["tpr"], roc_auc = roc["auc"], estimator_name = name))
 
         if 'Precision-Recall Curve' in metrics_list:
             st.subheader("Precision-Recall Curve")
-            plot_precision_recall_curve.from_estimator(model, x_test, y_test)
-            st.pyplot()
+            pr = result["pr"]
+            show_figure(plot_precision_recall_curve(precision = pr["precision"], recall = pr["recall"],
+                                                    average_precision = pr["average_precision"],
+                                                    estimator_name = name))
+
+    def show_results(title, params, metrics):
+        st.subheader(title)
+        result = fit_and_evaluate(classifier, params, data)
+        st.write("Accuracy: ", result["accuracy"])
+        st.write("Precision: ", result["precision"])
+        st.write("Recall: ", result["recall"])
+        plot_metrics(metrics, result)
             
-    df = load_data()
-    x_train, x_test, y_train, y_test = split(df)
+    data = load_split('mushrooms.csv', 'type', test_size = 0.3, random_state = SPLIT_SEED)
     class_names = ['edible', 'poisonous']
     st.sidebar.subheader("Choose Classifier")
     classifier = st.sidebar.selectbox("Classifier", ("Support Vector Machine (SVM)", "Logistic Regression", "Random Forest"))
@@ -71,15 +226,7 @@ def main():
         metrics = st.sidebar.multiselect("What metrics to plot?", ('Confusion Matrix', 'ROC Curve', 'Precision-Recall Curve'))
     
         if st.sidebar.button("Classify", key = 'classify'):
-            st.subheader("Support Vector Machine (SVM) Results")
-            model = SVC(C = C, kernel = kernel, gamma = gamma)
-            model.fit(x_train, y_train)
-            accuracy = model.score(x_test, y_test)
-            y_pred = model.predict(x_test)
-            st.write("Accuracy: ", accuracy)
-            st.write("Precision: ", precision_score(y_test, y_pred, labels = class_names))
-            st.write("Recall: ", recall_score(y_test, y_pred, labels = class_names))
-            plot_metrics(metrics, y_pred)
+            show_results("Support Vector Machine (SVM) Results", {"C": C, "kernel": kernel, "gamma": gamma}, metrics)
 
     if classifier == "Logistic Regression":
         st.sidebar.subheader("Model Hyperparameters")
@@ -89,15 +236,7 @@ def main():
         metrics = st.sidebar.multiselect("What metrics to plot?", ('Confusion Matrix', 'ROC Curve', 'Precision-Recall Curve'))
     
         if st.sidebar.button("Classify", key = 'classify'):
-            st.subheader("Logistic Regression Results")
-            model = LogisticRegression(C = C, max_iter = max_iter)
-            model.fit(x_train, y_train)
-            accuracy = model.score(x_test, y_test)
-            y_pred = model.predict(x_test)
-            st.write("Accuracy: ", accuracy)
-            st.write("Precision: ", precision_score(y_test, y_pred, labels = class_names))
-            st.write("Recall: ", recall_score(y_test, y_pred, labels = class_names))
-            plot_metrics(metrics, y_pred)            
+            show_results("Logistic Regression Results", {"C": C, "max_iter": max_iter}, metrics)
 
     if classifier == "Random Forest":
         st.sidebar.subheader("Model Hyperparameters")        
@@ -107,19 +246,12 @@ def main():
         metrics = st.sidebar.multiselect("What metrics to plot?", ('Confusion Matrix', 'ROC Curve', 'Precision-Recall Curve'))
     
         if st.sidebar.button("Classify", key = 'classify'):
-            st.subheader("Random Forest Results")
-            model = RandomForestClassifier(n_estimators = n_estimators, max_depth = max_depth, bootstrap = bootstrap, n_jobs = -1)
-            model.fit(x_train, y_train)
-            accuracy = model.score(x_test, y_test)
-            y_pred = model.predict(x_test)
-            st.write("Accuracy: ", accuracy)
-            st.write("Precision: ", precision_score(y_test, y_pred, labels = class_names))
-            st.write("Recall: ", recall_score(y_test, y_pred, labels = class_names))
-            plot_metrics(metrics, y_pred)
+            show_results("Random Forest Results",
+                         {"n_estimators": n_estimators, "max_depth": max_depth, "bootstrap": bootstrap}, metrics)
                         
     if st.sidebar.checkbox("Show raw data", False):
         st.subheader("Mushroom Data Set (Classification)")
-        st.write(df)
+        st.write(pd.DataFrame(data["data"], columns = data["columns"]))
     
 if __name__ == '__main__':
     main()
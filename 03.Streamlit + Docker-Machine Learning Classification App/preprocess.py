@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+# Encoded datasets and splits, one directory per (CSV content, split settings)
+CACHE_DIR = Path(os.environ.get("PREPROCESS_CACHE_DIR", ".cache"))
+
+ARRAYS = ("data", "x_train", "x_test", "y_train", "y_test")
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=32)
+def _stat_hash(path, mtime_ns, size):
+    return file_hash(path)
+
+
+def content_hash(path):
+    """Return file_hash(path), re-reading the file only when its mtime or size changes."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return _stat_hash(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def encode(df):
+    """
+    Label-encode every column into int8 codes.
+
+    Codes match LabelEncoder: classes are sorted and numbered from 0.
+
+    Returns:
+        tuple: (codes array of shape (rows, columns), {column: [classes]})
+    """
+    codes = np.empty(df.shape, dtype=np.int8)
+    encoders = {}
+    for i, col in enumerate(df.columns):
+        classes, inverse = np.unique(df[col].to_numpy(), return_inverse=True)
+        if len(classes) > np.iinfo(np.int8).max:
+            raise ValueError(f"Column {col} has too many categories for int8 codes: {len(classes)}")
+        codes[:, i] = inverse
+        encoders[col] = classes.tolist()
+    return codes, encoders
+
+
+def _build(csv_path, target, test_size, random_state, bundle_dir):
+    df = pd.read_csv(csv_path, dtype=str)
+    codes, encoders = encode(df)
+    target_index = df.columns.get_loc(target)
+    x = np.delete(codes, target_index, axis=1)
+    y = codes[:, target_index]
+    x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=test_size, random_state=random_state)
+
+    # Write into a temporary directory and rename it, so readers never see a partial bundle
+    tmp_dir = bundle_dir.with_name(bundle_dir.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for name, array in zip(ARRAYS, (codes, x_train, x_test, y_train, y_test)):
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+    with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"columns": df.columns.tolist(), "target": target, "encoders": encoders}, f)
+    try:
+        os.replace(tmp_dir, bundle_dir)
+    except OSError:
+        # Another process finished the same bundle first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_split(csv_path, target, test_size=0.3, random_state=0):
+    """
+    Load the encoded dataset and its train/test split, building them on first use.
+
+    Arrays are memory-mapped from .npy files and keyed by the CSV content hash,
+    so a changed CSV is re-encoded and an unchanged one is never parsed again.
+    The hash itself is only recomputed when the file's mtime or size changes.
+
+    Args:
+        csv_path: Path to the CSV file
+        target: Name of the target column
+        test_size: Fraction of rows held out for testing
+        random_state: Seed of the train/test split
+
+    Returns:
+        dict: key, columns, features, encoders and the data/x_train/x_test/y_train/y_test arrays
+    """
+    digest = content_hash(csv_path)
+    key = f"{Path(csv_path).stem}-{digest[:16]}-{target}-{test_size}-{random_state}"
+    bundle_dir = CACHE_DIR / key
+    if not (bundle_dir / "meta.json").exists():
+        _build(csv_path, target, test_size, random_state, bundle_dir)
+
+    with open(bundle_dir / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    bundle = {name: np.load(bundle_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    bundle.update(
+        key=key,
+        columns=meta["columns"],
+        features=[c for c in meta["columns"] if c != meta["target"]],
+        encoders=meta["encoders"],
+    )
+    return bundle
@@ -0,0 +1,167 @@
+"""Bulk CSV import and CSV/Parquet export of the users table over COPY.
+
+Uses asyncpg so rows are streamed with COPY FROM STDIN / COPY TO STDOUT
+instead of row-by-row INSERTs or fetchall().
+
+Run with:
+    python bulk.py import users.csv
+    python bulk.py export users.parquet
+"""
+import argparse
+import asyncio
+import csv
+import os
+import time
+
+import asyncpg
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from db import DB_CONFIG, USER_COLUMNS
+
+# Bytes read from an uploaded file per COPY message
+COPY_CHUNK_SIZE = 1 << 20
+
+# Rows fetched per Parquet row group during export
+EXPORT_BATCH_ROWS = 100_000
+
+EXPORT_SCHEMA = pa.schema([("id", pa.int32()), ("name", pa.string()), ("email", pa.string())])
+
+
+async def connect():
+    return await asyncpg.connect(
+        database=DB_CONFIG["dbname"], user=DB_CONFIG["user"], password=DB_CONFIG["password"],
+        host=DB_CONFIG["host"], port=DB_CONFIG["port"],
+    )
+
+
+def _read_header(path):
+    # utf-8-sig drops the byte order mark Excel writes; the BOM line is skipped by COPY HEADER
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        header = [c.strip() for c in next(csv.reader(f), [])]
+    unknown = [c for c in header if c not in USER_COLUMNS]
+    if unknown or not {"name", "email"} <= set(header):
+        raise ValueError(f"CSV header must contain name and email (and optionally id), got {header}")
+    return header
+
+
+def _stats(rows, started, **extra):
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else 0.0, **extra}
+
+
+async def import_users_csv(path, progress_callback=None):
+    """
+    Load a CSV of users with COPY, skipping emails that already exist.
+
+    The file is streamed into a temporary staging table and then merged with
+    INSERT ... ON CONFLICT DO NOTHING, so one duplicate does not abort the load.
+
+    Args:
+        path: CSV file with a header row (name, email and optionally id)
+        progress_callback: Optional function called with (bytes_sent, total_bytes)
+
+    Returns:
+        dict: rows (copied), inserted, seconds and rows_per_second
+    """
+    columns = _read_header(path)
+    total_bytes = os.path.getsize(path)
+    started = time.perf_counter()
+
+    async def chunks():
+        sent = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(COPY_CHUNK_SIZE):
+                sent += len(chunk)
+                yield chunk
+                if progress_callback:
+                    progress_callback(sent, total_bytes)
+
+    conn = await connect()
+    try:
+        async with conn.transaction():
+            await conn.execute(
+                "CREATE TEMP TABLE users_import (id integer, name varchar(100), email varchar(100)) ON COMMIT DROP"
+            )
+            status = await conn.copy_to_table(
+                "users_import", source=chunks(), columns=columns, format="csv", header=True
+            )
+            inserted = await conn.execute(
+                "INSERT INTO users (name, email) SELECT name, email FROM users_import "
+                "ON CONFLICT (email) DO NOTHING"
+            )
+    finally:
+        await conn.close()
+
+    # Status strings are "COPY <rows>" and "INSERT 0 <rows>"
+    return _stats(int(status.split()[-1]), started, inserted=int(inserted.split()[-1]))
+
+
+async def export_users(path, file_format="csv", progress_callback=None):
+    """
+    Stream the users table to a CSV (COPY TO) or Parquet (cursor batches) file.
+
+    Args:
+        path: Output file
+        file_format: "csv" or "parquet"
+        progress_callback: Optional function called with the rows (Parquet) or bytes (CSV) written so far
+
+    Returns:
+        dict: rows, seconds and rows_per_second
+    """
+    started = time.perf_counter()
+    conn = await connect()
+    try:
+        if file_format == "csv":
+            written = 0
+
+            with open(path, "wb") as f:
+                async def write(chunk):
+                    nonlocal written
+                    f.write(chunk)
+                    written += len(chunk)
+                    if progress_callback:
+                        progress_callback(written)
+
+                status = await conn.copy_from_query(
+                    "SELECT id, name, email FROM users ORDER BY id", output=write, format="csv", header=True
+                )
+            rows = int(status.split()[-1])
+        else:
+            rows = 0
+            with pq.ParquetWriter(path, EXPORT_SCHEMA) as writer:
+                async with conn.transaction():
+                    cursor = await conn.cursor("SELECT id, name, email FROM users ORDER BY id")
+                    while records := await cursor.fetch(EXPORT_BATCH_ROWS):
+                        columns = list(zip(*records))
+                        writer.write_table(pa.Table.from_arrays(
+                            [pa.array(c, type=field.type) for c, field in zip(columns, EXPORT_SCHEMA)],
+                            schema=EXPORT_SCHEMA,
+                        ))
+                        rows += len(records)
+                        if progress_callback:
+                            progress_callback(rows)
+    finally:
+        await conn.close()
+    return _stats(rows, started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Load a CSV into the users table")
+    import_parser.add_argument("path")
+    export_parser = subparsers.add_parser("export", help="Write the users table to .csv or .parquet")
+    export_parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        stats = asyncio.run(import_users_csv(args.path))
+    else:
+        file_format = "parquet" if args.path.endswith(".parquet") else "csv"
+        stats = asyncio.run(export_users(args.path, file_format))
+    print(", ".join(f"{k}={v:,.2f}" if isinstance(v, float) else f"{k}={v:,}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
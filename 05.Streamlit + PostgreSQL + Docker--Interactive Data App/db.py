@@ -0,0 +1,99 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+# Connection settings, overridable with the standard libpq environment variables
+DB_CONFIG = {
+    "dbname": os.environ.get("PGDATABASE", "mydb"),
+    "user": os.environ.get("PGUSER", "admin"),
+    "password": os.environ.get("PGPASSWORD", "adminpassword"),
+    "host": os.environ.get("PGHOST", "my_postgres"),  # PostgreSQL container name as hostname
+    "port": os.environ.get("PGPORT", "5432"),
+}
+
+POOL_MIN_CONNECTIONS = int(os.environ.get("DB_POOL_MIN", 1))
+POOL_MAX_CONNECTIONS = int(os.environ.get("DB_POOL_MAX", 10))
+# Seconds a session waits for a free connection when all of them are in use
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+
+USER_COLUMNS = ["id", "name", "email"]
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool that waits for a free connection instead of raising PoolError when exhausted."""
+
+    def __init__(self, minconn, maxconn, *args, timeout=POOL_TIMEOUT, **kwargs):
+        self._available = threading.BoundedSemaphore(maxconn)
+        self.timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._available.acquire(timeout=self.timeout):
+            raise PoolError(f"no connection available after {self.timeout:g}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._available.release()
+
+
+def create_pool():
+    """Create a thread-safe connection pool; Streamlit sessions run in separate threads."""
+    return BlockingConnectionPool(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, **DB_CONFIG)
+
+
+@contextmanager
+def connection(pool):
+    """Borrow a connection from the pool, committing on success and rolling back on error."""
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            # The connection itself is broken (e.g. the server restarted)
+            conn.close()
+        raise
+    finally:
+        # Broken connections are discarded instead of being handed to the next session
+        pool.putconn(conn, close=conn.closed != 0)
+
+
+def fetch_users_page(pool, after_id=0, page_size=100):
+    """
+    Fetch one page of users ordered by id, starting after a given id (keyset pagination).
+
+    Unlike OFFSET, the `id > after_id` condition uses the primary key index, so
+    every page costs the same no matter how deep into the table it is.
+
+    Args:
+        pool: Connection pool
+        after_id: Last id of the previous page (0 for the first page)
+        page_size: Maximum number of rows to return
+
+    Returns:
+        DataFrame: Users with the USER_COLUMNS columns
+    """
+    with connection(pool) as conn:
+        # Named (server-side) cursor: rows are streamed from the server in itersize batches
+        with conn.cursor(name="users_page") as cur:
+            cur.itersize = page_size
+            cur.execute(
+                "SELECT id, name, email FROM users WHERE id > %s ORDER BY id LIMIT %s",
+                (after_id, page_size),
+            )
+            rows = cur.fetchall()
+    return pd.DataFrame(rows, columns=USER_COLUMNS)
+
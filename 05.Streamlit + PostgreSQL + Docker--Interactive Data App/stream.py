@@ -1,32 +1,104 @@
+import asyncio
+import os
+import tempfile
+
 import streamlit as st
-import psycopg2
-
-# Database connection
-def get_db_connection():
-    conn = psycopg2.connect(
-        dbname="mydb",
-        user="admin",
-        password="adminpassword",
-        host="my_postgres",  # PostgreSQL container name as hostname
-        port="5432"
-    )
-    return conn
+
+from bulk import export_users, import_users_csv
+from db import create_pool, fetch_users_page
+
+# Seconds a fetched page is reused before it is queried again
+QUERY_CACHE_TTL = int(os.environ.get("QUERY_CACHE_TTL", 60))
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 100))
+
+
+# Database connection pool, shared by all sessions
+@st.cache_resource
+def get_pool():
+    return create_pool()
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def load_users_page(after_id, page_size):
+    return fetch_users_page(get_pool(), after_id, page_size)
+
 
 st.title("Streamlit App with PostgreSQL")
 
+# First id of every page visited so far, so "Previous" can step back
+if "page_starts" not in st.session_state:
+    st.session_state.page_starts = [0]
+
 try:
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    # Fetch data from PostgreSQL
-    cur.execute("SELECT * FROM users;")
-    rows = cur.fetchall()
+    after_id = st.session_state.page_starts[-1]
+    df = load_users_page(after_id, PAGE_SIZE)
 
     st.write("### User Data from PostgreSQL")
-    for row in rows:
-        st.write(f"ID: {row[0]}, Name: {row[1]}, Email: {row[2]}")
+    page_number = len(st.session_state.page_starts)
+    st.caption(f"Page {page_number} · {len(df)} users")
+    st.dataframe(df, hide_index=True, use_container_width=True)
 
-    cur.close()
-    conn.close()
+    col1, col2, col3 = st.columns(3)
+    if col1.button("⬅️ Previous", disabled=page_number == 1):
+        st.session_state.page_starts.pop()
+        st.rerun()
+    if col2.button("Next ➡️", disabled=len(df) < PAGE_SIZE):
+        st.session_state.page_starts.append(int(df["id"].iloc[-1]))
+        st.rerun()
+    if col3.button("🔄 Refresh"):
+        # Drop cached pages so changed rows show up immediately
+        load_users_page.clear()
+        st.rerun()
 except Exception as e:
-    st.error(f"Error connecting to database: {e}")
\ No newline at end of file
+    st.error(f"Error connecting to database: {e}")
+
+
+def show_stats(stats):
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows", f"{stats['rows']:,}")
+    col2.metric("Time", f"{stats['seconds']:.2f} s")
+    col3.metric("Throughput", f"{stats['rows_per_second']:,.0f} rows/s")
+
+
+st.write("### Bulk Import / Export")
+import_tab, export_tab = st.tabs(["Import CSV", "Export"])
+
+with import_tab:
+    uploaded_file = st.file_uploader("CSV with name and email columns", type=["csv"])
+    if uploaded_file is not None and st.button("Import Users"):
+        progress = st.progress(0.0, text="Uploading...")
+        with tempfile.NamedTemporaryFile(suffix=".csv") as tmp:
+            tmp.write(uploaded_file.getbuffer())
+            tmp.flush()
+            try:
+                stats = asyncio.run(import_users_csv(
+                    tmp.name, lambda sent, total: progress.progress(sent / total, text=f"Sent {sent:,} of {total:,} bytes")
+                ))
+            except Exception as e:
+                st.error(f"Error importing users: {e}")
+            else:
+                progress.empty()
+                st.success(f"Imported {stats['inserted']:,} new users ({stats['rows'] - stats['inserted']:,} duplicates skipped)")
+                show_stats(stats)
+                load_users_page.clear()
+
+with export_tab:
+    file_format = st.radio("Format", ["csv", "parquet"], horizontal=True)
+    if st.button("Export Users"):
+        status = st.empty()
+        unit = "bytes" if file_format == "csv" else "rows"
+        # One export file per session and format, reused across runs
+        key = f"export_path_{file_format}"
+        if key not in st.session_state:
+            fd, st.session_state[key] = tempfile.mkstemp(prefix="users_export_", suffix=f".{file_format}")
+            os.close(fd)
+        path = st.session_state[key]
+        try:
+            stats = asyncio.run(export_users(path, file_format, lambda done: status.text(f"Exported {done:,} {unit}...")))
+        except Exception as e:
+            st.error(f"Error exporting users: {e}")
+        else:
+            status.empty()
+            show_stats(stats)
+            with open(path, "rb") as f:
+                st.download_button("Download", f, file_name=f"users.{file_format}")
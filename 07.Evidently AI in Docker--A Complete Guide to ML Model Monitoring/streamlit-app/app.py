@@ -1,23 +1,106 @@
+import logging
 import os
 from pathlib import Path
 import streamlit as st
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Text
 
+from src.cache import ReportCache
+from src.catalog import ReportCatalog
+from src.catalog import REPORTS_DIR_NAME
+from src.drift import WINDOW_SKETCH_NAME
+from src.drift import drift_results
+from src.drift import load_window
+from src.metrics_store import MetricsStore
+from src.server import ReportServer
+from src.ui import display_drift_summary
 from src.ui import display_header
 from src.ui import display_report
 from src.ui import display_sidebar_header
+from src.ui import display_trends
 from src.ui import select_period
 from src.ui import select_project
 from src.ui import select_report
 from src.ui import set_page_container_style
 from src.utils import EntityNotFoundError
-from src.utils import get_reports_mapping
-from src.utils import list_periods
 
-PROJECTS_DIR: Path = Path("../projects")
-REPORTS_DIR_NAME: Text = "reports"
+PROJECTS_DIR: Path = Path(os.environ.get("PROJECTS_DIR", "../projects"))
+CATALOG_PATH: Path = Path(os.environ.get("CATALOG_PATH", ".catalog.json"))
+
+# Seconds between background refreshes of the report catalog
+CATALOG_REFRESH_SECONDS: float = float(os.environ.get("CATALOG_REFRESH_SECONDS", 10))
+
+# Memory budget for inlined reports; least recently used reports are evicted first
+REPORT_CACHE_MB: int = int(os.environ.get("REPORT_CACHE_MB", 256))
+
+# Reports above this size are embedded by URL from the report server (0 disables the server)
+INLINE_MAX_BYTES: int = int(os.environ.get("INLINE_MAX_BYTES", 1 << 20))
+REPORT_SERVER_PORT: int = int(os.environ.get("REPORT_SERVER_PORT", 8502))
+REPORT_SERVER_URL: Optional[Text] = os.environ.get("REPORT_SERVER_URL")
+REPORT_CACHE_DIR: Path = Path(os.environ.get("REPORT_CACHE_DIR", ".report_cache"))
+
+# Headline numbers of all reports, written by the project pipelines
+METRICS_DB: Path = Path(os.environ.get("METRICS_DB", PROJECTS_DIR / "metrics.db"))
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def get_catalog() -> ReportCatalog:
+    """Build the report catalog once per process and keep it fresh in the background.
+
+    A persisted index is served right away and revalidated in the background;
+    only the very first start has to scan the projects directory up front.
+    """
+    catalog = ReportCatalog(PROJECTS_DIR, CATALOG_PATH)
+    if catalog.is_empty:
+        catalog.refresh()
+    catalog.start_background_refresh(CATALOG_REFRESH_SECONDS)
+    return catalog
+
+
+@st.cache_resource
+def get_report_cache() -> ReportCache:
+    """One report cache shared by all sessions."""
+    return ReportCache(max_bytes=REPORT_CACHE_MB * 1024 * 1024)
+
+
+@st.cache_resource
+def get_report_server() -> Optional[ReportServer]:
+    """Start the side HTTP endpoint for large reports once per process.
+
+    Returns None (and reports are inlined) when it is disabled or the port is taken.
+    """
+    if INLINE_MAX_BYTES <= 0:
+        return None
+    try:
+        return ReportServer(
+            PROJECTS_DIR, REPORT_CACHE_DIR, port=REPORT_SERVER_PORT, public_url=REPORT_SERVER_URL
+        ).start()
+    except OSError as e:
+        logger.warning("Report server not started, reports are inlined instead: %s", e)
+        return None
+
+
+@st.cache_resource
+def get_metrics_store() -> MetricsStore:
+    """One read-only view of the metrics store shared by all sessions."""
+    return MetricsStore(METRICS_DB, read_only=True)
+
+
+@st.cache_data(max_entries=64)
+def get_drift_summary(project: Text, period: Text, sketch_mtime_ns: int) -> Optional[Dict]:
+    """Run the sketch-based drift tests of a period (cached until its sketch is rewritten)."""
+    try:
+        window = load_window(PROJECTS_DIR / project / REPORTS_DIR_NAME, period)
+    except ValueError as e:
+        logger.warning("Drift sketch of %s/%s not usable: %s", project, period, e)
+        return None
+    if window is None:
+        return None
+    return {"results": drift_results(window), "rows": window.rows}
 
 
 if __name__ == "__main__":
@@ -25,29 +108,33 @@ if __name__ == "__main__":
     # Configure some styles
     set_page_container_style()
 
-    # Extract available project names and reports directory name
-    projects: List[Text] = []
-    for path in os.listdir(PROJECTS_DIR):
-        if not path.startswith("."):
-            projects.append(path)
-
     try:
 
+        # Projects, periods and reports are served from the in-memory catalog
+        catalog: ReportCatalog = get_catalog()
+        projects: List[Text] = catalog.list_projects()
+
         # Sidebar: Logo and links
         display_sidebar_header()
 
-        # Sidebar: Select project (UI) and build reports directory path
+        # Sidebar: Select project (UI)
         selected_project: Path = PROJECTS_DIR / select_project(projects)
-        reports_dir: Path = selected_project / REPORTS_DIR_NAME
+
+        # Sidebar: Select view
+        view: Text = st.sidebar.radio("🧭 View", ("Reports", "Trends"), horizontal=True)
+        if view == "Trends":
+            display_trends(get_metrics_store().load(selected_project.name))
+            st.stop()
 
         # Sidebar: Select period
-        periods: List[Text] = list_periods(reports_dir)
+        periods: List[Text] = catalog.list_periods(selected_project.name)
         selected_period: Text = select_period(periods)
-        period_dir: Path = reports_dir / selected_period
 
         # Sidebar: Select report (UI)
 
-        report_mapping: Dict[Text, Path] = get_reports_mapping(period_dir)
+        report_mapping: Dict[Text, Path] = catalog.get_reports_mapping(
+            selected_project.name, selected_period
+        )
         selected_report_name: Text = select_report(report_mapping)
         selected_report: Path = report_mapping[selected_report_name]
 
@@ -57,8 +144,22 @@ if __name__ == "__main__":
             period=selected_period,
             report_name=selected_report_name,
         )
+        # Display drift summary if the period has sketches (see src/drift.py)
+        sketch_path: Path = selected_project / REPORTS_DIR_NAME / selected_period / WINDOW_SKETCH_NAME
+        if sketch_path.exists():
+            drift_summary = get_drift_summary(
+                selected_project.name, selected_period, sketch_path.stat().st_mtime_ns
+            )
+            if drift_summary is not None:
+                display_drift_summary(drift_summary["results"], drift_summary["rows"])
+
         # Display selected report(UI)
-        display_report(selected_report)
+        display_report(
+            selected_report,
+            report_cache=get_report_cache(),
+            report_server=get_report_server(),
+            inline_max_bytes=INLINE_MAX_BYTES,
+        )
 
     except EntityNotFoundError as e:
         # If some entity (periods directories, specific period or report files)
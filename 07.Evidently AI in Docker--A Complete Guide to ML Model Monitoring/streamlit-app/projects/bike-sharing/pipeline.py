@@ -0,0 +1,365 @@
+"""Generate the weekly Evidently reports of the bike-sharing project.
+
+Does what bicycle_demand_monitoring.ipynb does for one week, for every week
+of a date range:
+
+- the model is fitted on the reference period once and cached in models/,
+  together with its reference predictions;
+- the four reports of every week run in parallel worker processes;
+- a week is skipped when its inputs (data, model, report set) did not change
+  since its reports were generated;
+- sketches of the reference data and of every week are saved next to the
+  reports, for the dashboard's drift summary (see streamlit-app/src/drift.py);
+- the headline numbers of every report go to the metrics store read by the
+  dashboard's trend view (see streamlit-app/src/metrics_store.py).
+
+Reports are written to reports/<start>_<end>/, the layout the dashboard reads.
+A period is built in a hidden temporary directory and renamed into place once
+all of its reports succeeded, so the dashboard never lists a partial period.
+
+The drift sketches and metrics store code is shared with the dashboard
+(streamlit-app/src), so run it as a module from the streamlit-app directory:
+    python -m projects.bike-sharing.pipeline --start 2011-01-29 --end 2011-02-25
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+import joblib
+import pandas as pd
+from sklearn import ensemble
+
+from src.drift import REFERENCE_SKETCH_NAME
+from src.drift import WINDOW_SKETCH_NAME
+from src.drift import ReferenceSketch
+from src.drift import WindowSketch
+from src.drift import drift_results
+from src.drift import save_sketch
+from src.metrics_store import MetricRow
+from src.metrics_store import MetricsStore
+from src.metrics_store import extract_metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_NAME: Text = "bike-sharing"
+
+# Paths are relative to this project, not to the directory the module is run from
+PROJECT_DIR: Path = Path(__file__).resolve().parent
+DATA_PATH: Path = PROJECT_DIR / "data" / "hour.csv"
+MODELS_DIR: Path = PROJECT_DIR / "models"
+REPORTS_DIR: Path = PROJECT_DIR / "reports"
+METRICS_DB: Path = PROJECT_DIR.parent / "metrics.db"
+
+REF_MONTH_START: Text = "2011-01-01"
+REF_MONTH_END: Text = "2011-01-28"
+
+CUR_START: Text = "2011-01-29"
+CUR_END: Text = "2011-02-25"
+
+TARGET: Text = "cnt"
+PREDICTION: Text = "prediction"
+NUMERICAL_FEATURES: List[Text] = ["temp", "atemp", "hum", "windspeed", "hr", "weekday"]
+CATEGORICAL_FEATURES: List[Text] = ["season", "holiday", "workingday"]
+MODEL_PARAMS: Dict = {"random_state": 0, "n_estimators": 50}
+
+REPORTS: List[Text] = ["model_performance", "target_drift", "data_drift", "data_quality"]
+
+# Bump when the report definitions below change, so existing periods are regenerated
+REPORTS_VERSION: int = 4
+
+# Hidden, so the dashboard does not list it as a report
+MANIFEST_NAME: Text = ".manifest.json"
+
+# Set in each worker process by _init_worker
+_reference: Optional[pd.DataFrame] = None
+
+
+def load_data(path: Path = DATA_PATH) -> pd.DataFrame:
+    """Load the hourly bike sharing data indexed by day."""
+    return pd.read_csv(path, header=0, sep=",", parse_dates=["dteday"], index_col="dteday")
+
+
+def frame_hash(df: pd.DataFrame) -> Text:
+    """Hash the contents (values, index and column names) of a data frame."""
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode("utf8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def weekly_periods(start: Text, end: Text) -> List[Tuple[Text, Text]]:
+    """Split a date range into consecutive 7-day periods; an incomplete last week is dropped.
+
+    Returns:
+        List[Tuple[Text, Text]]: (first day, last day) of each week as '%Y-%m-%d'.
+    """
+    periods: List[Tuple[Text, Text]] = []
+    week_start = pd.Timestamp(start)
+    while week_start + pd.Timedelta(days=6) <= pd.Timestamp(end):
+        week_end = week_start + pd.Timedelta(days=6)
+        periods.append((week_start.strftime("%Y-%m-%d"), week_end.strftime("%Y-%m-%d")))
+        week_start += pd.Timedelta(days=7)
+    return periods
+
+
+def fit_reference(reference: pd.DataFrame, models_dir: Path = MODELS_DIR) -> Tuple[ensemble.RandomForestRegressor, Text]:
+    """Fit the regressor on the reference data, or load it if it was fitted on the same data before.
+
+    The reference frame gets a `prediction` column (cached with the model).
+
+    Returns:
+        Tuple[RandomForestRegressor, Text]: Model and its cache key.
+    """
+    features = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+    key: Text = hashlib.sha256(
+        json.dumps([frame_hash(reference), features, TARGET, MODEL_PARAMS]).encode("utf8")
+    ).hexdigest()[:16]
+    model_path = models_dir / f"regressor-{key}.joblib"
+
+    if model_path.exists():
+        cached = joblib.load(model_path)
+        logger.info("Loaded model %s", model_path)
+    else:
+        start = time.perf_counter()
+        model = ensemble.RandomForestRegressor(n_jobs=-1, **MODEL_PARAMS)
+        model.fit(reference[features], reference[TARGET])
+        cached = {"model": model, "reference_prediction": model.predict(reference[features])}
+        models_dir.mkdir(parents=True, exist_ok=True)
+        joblib.dump(cached, model_path)
+        logger.info("Fitted model %s in %.1fs", model_path, time.perf_counter() - start)
+
+    reference[PREDICTION] = cached["reference_prediction"]
+    return cached["model"], key
+
+
+def _init_worker(reference: pd.DataFrame) -> None:
+    # The reference frame is sent once per worker instead of once per report
+    global _reference
+    _reference = reference
+
+
+def build_report(report_name: Text, current: pd.DataFrame, path: Path) -> Tuple[Text, List[MetricRow]]:
+    """Run one report (as in the notebook) against the worker's reference data and save it as HTML.
+
+    Returns:
+        Tuple[Text, List[MetricRow]]: Report name and its headline numbers.
+    """
+    from evidently.metric_preset import DataDriftPreset
+    from evidently.metric_preset import DataQualityPreset
+    from evidently.metric_preset import RegressionPreset
+    from evidently.metric_preset import TargetDriftPreset
+    from evidently.pipeline.column_mapping import ColumnMapping
+    from evidently.report import Report
+
+    column_mapping = ColumnMapping()
+    column_mapping.numerical_features = NUMERICAL_FEATURES
+    if report_name in ("model_performance", "target_drift"):
+        column_mapping.target = TARGET
+        column_mapping.prediction = PREDICTION
+        column_mapping.categorical_features = CATEGORICAL_FEATURES
+
+    preset = {
+        "model_performance": RegressionPreset,
+        "target_drift": TargetDriftPreset,
+        "data_drift": DataDriftPreset,
+        "data_quality": DataQualityPreset,
+    }[report_name]
+    report = Report(metrics=[preset()])
+    report.run(reference_data=_reference, current_data=current, column_mapping=column_mapping)
+    report.save_html(str(path))
+    return report_name, extract_metrics(report_name, report.as_dict())
+
+
+def period_inputs_hash(model_key: Text, reference_hash: Text, current: pd.DataFrame) -> Text:
+    """Hash everything a period's reports depend on."""
+    from evidently import __version__ as evidently_version
+
+    return hashlib.sha256(json.dumps({
+        "model": model_key,
+        "reference": reference_hash,
+        "current": frame_hash(current),
+        "reports": REPORTS,
+        "reports_version": REPORTS_VERSION,
+        "evidently": evidently_version,
+    }).encode("utf8")).hexdigest()
+
+
+def sketch_metrics(window: WindowSketch) -> List[MetricRow]:
+    """Sketch-based drift results of a period as metrics rows."""
+    rows: List[MetricRow] = []
+    for result in drift_results(window).itertuples():
+        rows.append(("sketch", "psi", result.column, result.psi))
+        rows.append(("sketch", "p_value", result.column, result.p_value))
+        rows.append(("sketch", "drift_detected", result.column, float(result.drift_detected)))
+    return rows
+
+
+def is_up_to_date(period_dir: Path, inputs_hash: Text) -> bool:
+    """True if the period's reports exist and were generated from the same inputs."""
+    try:
+        with open(period_dir / MANIFEST_NAME, encoding="utf8") as manifest_f:
+            manifest: Dict = json.load(manifest_f)
+    except (FileNotFoundError, ValueError):
+        return False
+    return manifest.get("inputs_hash") == inputs_hash and all(
+        (period_dir / f"{name}.html").exists() for name in REPORTS
+    ) and (period_dir / WINDOW_SKETCH_NAME).exists()
+
+
+def publish_period(build_dir: Path, period_dir: Path) -> None:
+    """Replace a period directory with a completely built one."""
+    old_dir = build_dir.with_name(f"{build_dir.name}.old")
+    if period_dir.exists():
+        os.replace(period_dir, old_dir)
+    os.replace(build_dir, period_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def run(
+    start: Text = CUR_START,
+    end: Text = CUR_END,
+    reference_start: Text = REF_MONTH_START,
+    reference_end: Text = REF_MONTH_END,
+    data_path: Path = DATA_PATH,
+    reports_dir: Path = REPORTS_DIR,
+    models_dir: Path = MODELS_DIR,
+    metrics_db: Path = METRICS_DB,
+    project: Text = PROJECT_NAME,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[Text, Text]:
+    """Generate the reports of every week between `start` and `end`.
+
+    Returns:
+        Dict[Text, Text]: Period directory name -> "generated", "skipped" or "failed".
+    """
+    started = time.perf_counter()
+    raw_data = load_data(data_path)
+    reference = raw_data.loc[reference_start:reference_end].copy()
+    model, model_key = fit_reference(reference, models_dir)
+    reference_hash = frame_hash(reference)
+
+    # Predict the whole range at once and slice it per week
+    current = raw_data.loc[start:end].copy()
+    current[PREDICTION] = model.predict(current[NUMERICAL_FEATURES + CATEGORICAL_FEATURES])
+
+    # Target and prediction are sketched too, for target drift
+    reference_sketch = ReferenceSketch.from_frame(
+        reference, NUMERICAL_FEATURES + [TARGET, PREDICTION], CATEGORICAL_FEATURES
+    )
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    save_sketch(reference_sketch, reports_dir / REFERENCE_SKETCH_NAME)
+    # Build directories left behind by interrupted runs
+    for stale_dir in reports_dir.glob(".*.tmp*"):
+        shutil.rmtree(stale_dir, ignore_errors=True)
+
+    store = MetricsStore(metrics_db)
+    status: Dict[Text, Text] = {}
+    pending: Dict[Text, Tuple[pd.DataFrame, Text]] = {}
+    # Hidden, so the dashboard does not list a period before all its reports exist
+    build_dirs: Dict[Text, Path] = {}
+    metrics: Dict[Text, List[MetricRow]] = {}
+    for week_start, week_end in weekly_periods(start, end):
+        period = f"{week_start}_{week_end}"
+        week = current.loc[week_start:week_end]
+        if week.empty:
+            logger.warning("No data for %s, skipped", period)
+            continue
+        inputs_hash = period_inputs_hash(model_key, reference_hash, week)
+        if (
+            not force
+            and is_up_to_date(reports_dir / period, inputs_hash)
+            and store.has_period(project, period, REPORTS)
+        ):
+            status[period] = "skipped"
+            continue
+        build_dirs[period] = reports_dir / f".{period}.{os.getpid()}.tmp"
+        build_dirs[period].mkdir()
+        window = WindowSketch(reference_sketch).update(week)
+        save_sketch(window, build_dirs[period] / WINDOW_SKETCH_NAME)
+        pending[period] = (week, inputs_hash)
+        metrics[period] = sketch_metrics(window)
+
+    remaining: Dict[Text, int] = {period: len(REPORTS) for period in pending}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(reference,)) as executor:
+        futures = {
+            executor.submit(build_report, name, week, build_dirs[period] / f"{name}.html"): period
+            for period, (week, _) in pending.items()
+            for name in REPORTS
+        }
+        for future in as_completed(futures):
+            period = futures[future]
+            try:
+                report_name, report_metrics = future.result()
+                metrics[period].extend(report_metrics)
+                logger.info("%s/%s.html done", period, report_name)
+            except Exception:
+                logger.exception("A report of %s failed", period)
+                status[period] = "failed"
+            remaining[period] -= 1
+            if remaining[period] > 0:
+                continue
+            if status.get(period) == "failed":
+                # The previous version of the period, if any, stays in place
+                shutil.rmtree(build_dirs[period], ignore_errors=True)
+                continue
+            with open(build_dirs[period] / MANIFEST_NAME, "w", encoding="utf8") as manifest_f:
+                json.dump({"inputs_hash": pending[period][1], "reports": REPORTS}, manifest_f)
+            publish_period(build_dirs[period], reports_dir / period)
+            store.write_period(project, period, metrics.pop(period))
+            status[period] = "generated"
+
+    logger.info(
+        "%d periods generated, %d skipped, %d failed in %.1fs",
+        *(sum(s == kind for s in status.values()) for kind in ("generated", "skipped", "failed")),
+        time.perf_counter() - started,
+    )
+    return dict(sorted(status.items()))
+
+
+def main(argv: Optional[List[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", default=CUR_START, help="First day of the first week")
+    parser.add_argument("--end", default=CUR_END, help="Last day of the range")
+    parser.add_argument("--reference-start", default=REF_MONTH_START)
+    parser.add_argument("--reference-end", default=REF_MONTH_END)
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help="Path to hour.csv")
+    parser.add_argument("--reports-dir", type=Path, default=REPORTS_DIR)
+    parser.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    parser.add_argument("--metrics-db", type=Path, default=METRICS_DB, help="SQLite metrics store")
+    parser.add_argument("--project", default=PROJECT_NAME, help="Project name in the metrics store")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Regenerate up-to-date periods too")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    status = run(
+        start=args.start,
+        end=args.end,
+        reference_start=args.reference_start,
+        reference_end=args.reference_end,
+        data_path=args.data,
+        reports_dir=args.reports_dir,
+        models_dir=args.models_dir,
+        metrics_db=args.metrics_db,
+        project=args.project,
+        workers=args.workers,
+        force=args.force,
+    )
+    for period, period_status in status.items():
+        print(f"{period}: {period_status}")
+
+
+if __name__ == "__main__":
+    main()
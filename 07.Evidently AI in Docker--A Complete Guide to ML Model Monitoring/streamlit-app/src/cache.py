@@ -0,0 +1,68 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Text
+from typing import Tuple
+
+
+class ReportCache:
+    """Least recently used cache of report contents, bounded by total size in bytes.
+
+    Entries are keyed by path, mtime and size, so a regenerated report is read
+    again instead of being served stale. Reports larger than the whole budget
+    are read but not cached.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Args:
+            max_bytes (int): Total size of the cached contents (UTF-8 encoded).
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Path, Tuple[Tuple[int, int], Text, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Text:
+        """Return the report content, reading it from disk on a miss.
+
+        Args:
+            path (Path): Report file path.
+
+        Returns:
+            Text: Report content.
+        """
+        stat = os.stat(path)
+        version: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        with open(path, encoding="utf8") as report_f:
+            content: Text = report_f.read()
+        self._put(path, version, content)
+        return content
+
+    def _put(self, path: Path, version: Tuple[int, int], content: Text) -> None:
+        size = len(content.encode("utf8"))
+        with self._lock:
+            self._discard(path)
+            if size > self.max_bytes:
+                return
+            self._entries[path] = (version, content, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def _discard(self, path: Path) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+
+from src.utils import EntityNotFoundError
+from src.utils import get_report_name
+
+REPORTS_DIR_NAME: Text = "reports"
+CATALOG_VERSION: int = 1
+
+# Kept outside the projects directory, since writing it would change that directory's mtime
+DEFAULT_INDEX_PATH: Path = Path(".catalog.json")
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _scan_period(period_dir: Path) -> Dict:
+    """Stat the reports of one period directory."""
+    reports: Dict[Text, Dict] = {}
+    with os.scandir(period_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            stat = entry.stat()
+            reports[entry.name] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "is_dir": entry.is_dir(),
+            }
+    return reports
+
+
+class ReportCatalog:
+    """In-memory index of projects -> periods -> reports, persisted as JSON.
+
+    The index is refreshed incrementally: a directory is only listed again when
+    its mtime changed (a file or subdirectory was added, removed or renamed),
+    so a refresh of an unchanged tree costs one stat per directory.
+
+    Readers always see a complete snapshot; `refresh` builds a new index and
+    swaps it in atomically.
+    """
+
+    def __init__(self, projects_dir: Path, index_path: Path = DEFAULT_INDEX_PATH) -> None:
+        """
+        Args:
+            projects_dir (Path): Directory containing the projects.
+            index_path (Path): Where the index is persisted between restarts.
+        """
+        self.projects_dir = Path(projects_dir)
+        self.index_path = Path(index_path)
+        self.refreshed_at: float = 0.0
+        self._lock = threading.Lock()
+        self._index: Dict = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.index_path, encoding="utf8") as index_f:
+                index: Dict = json.load(index_f)
+            if index.get("version") == CATALOG_VERSION and index.get("projects_dir") == str(self.projects_dir):
+                return index
+        except (FileNotFoundError, ValueError):
+            pass
+        return {"version": CATALOG_VERSION, "projects_dir": str(self.projects_dir), "mtime_ns": None, "projects": {}}
+
+    @property
+    def is_empty(self) -> bool:
+        """True until the index was either loaded from disk or refreshed once."""
+        return self._index["mtime_ns"] is None
+
+    def _save(self, index: Dict) -> None:
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf8") as index_f:
+                json.dump(index, index_f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # A read-only app directory still works, it just cannot reuse the index after a restart
+            pass
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the file system.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        with self._lock:
+            old: Dict = self._index
+            root_mtime = _mtime_ns(self.projects_dir)
+            if root_mtime is None:
+                raise EntityNotFoundError(f"🔍 Projects directory {self.projects_dir} not found")
+
+            if root_mtime == old["mtime_ns"]:
+                project_names = list(old["projects"])
+            else:
+                project_names = sorted(
+                    entry.name for entry in os.scandir(self.projects_dir)
+                    if not entry.name.startswith(".") and entry.is_dir()
+                )
+
+            projects: Dict[Text, Dict] = {}
+            for name in project_names:
+                projects[name] = self._refresh_project(name, old["projects"].get(name))
+
+            index = {
+                "version": CATALOG_VERSION,
+                "projects_dir": str(self.projects_dir),
+                "mtime_ns": root_mtime,
+                "projects": projects,
+            }
+            changed = index != old
+            if changed:
+                self._index = index
+                self._save(index)
+            self.refreshed_at = time.time()
+            return changed
+
+    def _refresh_project(self, name: Text, old: Optional[Dict]) -> Dict:
+        reports_dir = self.projects_dir / name / REPORTS_DIR_NAME
+        mtime = _mtime_ns(reports_dir)
+        if mtime is None:
+            return {"mtime_ns": None, "periods": {}}
+        old = old or {"mtime_ns": None, "periods": {}}
+
+        if mtime == old["mtime_ns"]:
+            period_names = list(old["periods"])
+        else:
+            period_names = sorted(
+                entry.name for entry in os.scandir(reports_dir)
+                if not entry.name.startswith(".") and entry.is_dir()
+            )
+
+        periods: Dict[Text, Dict] = {}
+        for period in period_names:
+            period_dir = reports_dir / period
+            period_mtime = _mtime_ns(period_dir)
+            if period_mtime is None:
+                continue
+            old_period = old["periods"].get(period)
+            if old_period and old_period["mtime_ns"] == period_mtime:
+                periods[period] = old_period
+            else:
+                periods[period] = {"mtime_ns": period_mtime, "reports": _scan_period(period_dir)}
+        return {"mtime_ns": mtime, "periods": periods}
+
+    def refresh_if_stale(self, max_age: float) -> None:
+        """Refresh the index if the last refresh is older than `max_age` seconds."""
+        if time.time() - self.refreshed_at > max_age:
+            self.refresh()
+
+    def start_background_refresh(self, interval: float) -> threading.Thread:
+        """Refresh the index now and then every `interval` seconds in a daemon thread."""
+
+        def run() -> None:
+            while True:
+                try:
+                    self.refresh()
+                except Exception:
+                    # Keep serving the last good index; the next round retries
+                    pass
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run, name="report-catalog-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def list_projects(self) -> List[Text]:
+        """List project names."""
+        return list(self._index["projects"])
+
+    def list_periods(self, project: Text) -> List[Text]:
+        """List period directory names of a project, sorted.
+
+        Raises:
+            EntityNotFoundError: If the project has no reports directory.
+        """
+        entry = self._index["projects"].get(project)
+        if entry is None or entry["mtime_ns"] is None:
+            raise EntityNotFoundError(
+                f"🔍 Reports directory not found: {self.projects_dir / project / REPORTS_DIR_NAME}"
+            )
+        return list(entry["periods"])
+
+    def get_reports_mapping(self, project: Text, period: Text) -> Dict[Text, Path]:
+        """Same mapping as `src.utils.get_reports_mapping`, served from the index.
+
+        Returns:
+            Dict[Text, Path]: Human readable report names mapped to report paths.
+        """
+        periods = self._index["projects"].get(project, {}).get("periods", {})
+        if period not in periods:
+            raise EntityNotFoundError(f"🔍 Period not found: {period}")
+
+        period_dir = self.projects_dir / project / REPORTS_DIR_NAME / period
+        mapping: Dict[Text, Path] = {}
+        for filename, info in sorted(periods[period]["reports"].items()):
+            path = period_dir / filename
+            name: Text = get_report_name(path)
+            if info["is_dir"]:
+                name += " (folder)"
+            mapping[name] = path
+        return mapping
+
+    def get_report_info(self, project: Text, period: Text, filename: Text) -> Optional[Dict]:
+        """Return size, mtime_ns and is_dir of a report as of the last refresh."""
+        periods = self._index["projects"].get(project, {}).get("periods", {})
+        return periods.get(period, {}).get("reports", {}).get(filename)
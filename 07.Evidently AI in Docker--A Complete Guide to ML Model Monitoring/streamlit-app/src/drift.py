@@ -0,0 +1,278 @@
+"""Drift tests computed from compact sketches instead of full data frames.
+
+The reference data never changes, so it is summarized once:
+- numerical columns as counts over quantile bins of the reference data;
+- categorical columns as frequency tables.
+
+A current window is summarized over the same bins and can be updated with
+new rows as they arrive. PSI, Kolmogorov-Smirnov and chi-square tests then
+only touch a few dozen counts per column, not the rows behind them.
+
+KS is computed on the binned distributions, so its statistic is a lower bound
+of the exact one; the bins are reference quantiles, which keeps it close.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+
+import numpy as np
+import pandas as pd
+from scipy.special import kolmogorov
+from scipy.stats import chi2
+
+SKETCH_VERSION: int = 2
+
+# Quantile bins per numerical column
+DEFAULT_BINS: int = 20
+
+# Empty bins are replaced by this share so that PSI stays finite (as Evidently does)
+PSI_MIN_SHARE: float = 1e-4
+
+# Drift is detected when the test p-value is below this threshold
+DEFAULT_THRESHOLD: float = 0.05
+
+# Sketch files: one for the reference data per project, one per period directory
+REFERENCE_SKETCH_NAME: Text = ".reference_sketch.json"
+WINDOW_SKETCH_NAME: Text = ".window_sketch.json"
+
+
+def _bin_counts(values: pd.Series, edges: np.ndarray) -> np.ndarray:
+    values = values.dropna().to_numpy(dtype=float)
+    return np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+
+
+def _category_key(value) -> Text:
+    # An integer column with missing values is read as float: 1 and 1.0 are the same category
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _value_counts(values: pd.Series) -> Dict[Text, int]:
+    # Keys are strings so that sketches survive a JSON round trip
+    counts: Dict[Text, int] = {}
+    for value, count in values.dropna().value_counts().items():
+        key = _category_key(value)
+        counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+class ReferenceSketch:
+    """Bin edges and counts (numerical) and frequency tables (categorical) of the reference data."""
+
+    def __init__(self, numerical: Dict[Text, Dict], categorical: Dict[Text, Dict], rows: int) -> None:
+        self.numerical = numerical
+        self.categorical = categorical
+        self.rows = rows
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        numerical_features: List[Text],
+        categorical_features: List[Text],
+        bins: int = DEFAULT_BINS,
+    ) -> "ReferenceSketch":
+        """Summarize reference data.
+
+        Args:
+            df (pd.DataFrame): Reference data.
+            numerical_features (List[Text]): Columns sketched with quantile bins.
+            categorical_features (List[Text]): Columns sketched with frequency tables.
+            bins (int): Number of quantile bins per numerical column (fewer if values repeat).
+
+        Returns:
+            ReferenceSketch: Sketch of the reference data.
+        """
+        numerical: Dict[Text, Dict] = {}
+        for column in numerical_features:
+            values = df[column].dropna().to_numpy(dtype=float)
+            # Interior edges only: the outer bins are open, so no current value falls outside
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+            numerical[column] = {
+                "edges": edges.tolist(),
+                "counts": _bin_counts(df[column], edges).tolist(),
+                "missing": int(df[column].isna().sum()),
+            }
+
+        categorical: Dict[Text, Dict] = {
+            column: {"counts": _value_counts(df[column]), "missing": int(df[column].isna().sum())}
+            for column in categorical_features
+        }
+        return cls(numerical, categorical, len(df))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": SKETCH_VERSION,
+            "rows": self.rows,
+            "numerical": self.numerical,
+            "categorical": self.categorical,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReferenceSketch":
+        if data.get("version") != SKETCH_VERSION:
+            raise ValueError(f"Unsupported sketch version: {data.get('version')}")
+        return cls(data["numerical"], data["categorical"], data["rows"])
+
+
+class WindowSketch:
+    """Counts of a current window over the bins of a reference sketch, updated incrementally."""
+
+    def __init__(self, reference: ReferenceSketch) -> None:
+        self.reference = reference
+        self._edges: Dict[Text, np.ndarray] = {
+            column: np.asarray(sketch["edges"]) for column, sketch in reference.numerical.items()
+        }
+        self.numerical: Dict[Text, np.ndarray] = {
+            column: np.zeros(len(edges) + 1, dtype=np.int64) for column, edges in self._edges.items()
+        }
+        self.categorical: Dict[Text, Dict[Text, int]] = {column: {} for column in reference.categorical}
+        self.missing: Dict[Text, int] = {column: 0 for column in [*self.numerical, *self.categorical]}
+        self.rows = 0
+
+    def update(self, rows: pd.DataFrame) -> "WindowSketch":
+        """Add new rows (e.g. the latest hour) to the window."""
+        for column, edges in self._edges.items():
+            self.numerical[column] += _bin_counts(rows[column], edges)
+            self.missing[column] += int(rows[column].isna().sum())
+        for column, counts in self.categorical.items():
+            for value, count in _value_counts(rows[column]).items():
+                counts[value] = counts.get(value, 0) + count
+            self.missing[column] += int(rows[column].isna().sum())
+        self.rows += len(rows)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": SKETCH_VERSION,
+            "rows": self.rows,
+            "numerical": {column: counts.tolist() for column, counts in self.numerical.items()},
+            "categorical": self.categorical,
+            "missing": self.missing,
+        }
+
+    @classmethod
+    def from_dict(cls, reference: ReferenceSketch, data: Dict) -> "WindowSketch":
+        if data.get("version") != SKETCH_VERSION:
+            raise ValueError(f"Unsupported sketch version: {data.get('version')}")
+        window = cls(reference)
+        for column, counts in data["numerical"].items():
+            if len(counts) != len(window.numerical[column]):
+                raise ValueError(f"Window sketch of {column} does not match the reference bins")
+            window.numerical[column] = np.asarray(counts, dtype=np.int64)
+        window.categorical = {column: dict(counts) for column, counts in data["categorical"].items()}
+        window.missing = dict(data["missing"])
+        window.rows = data["rows"]
+        return window
+
+
+def psi(reference_counts: np.ndarray, current_counts: np.ndarray) -> float:
+    """Population stability index between two count vectors over the same bins."""
+    reference_share = np.clip(reference_counts / max(reference_counts.sum(), 1), PSI_MIN_SHARE, None)
+    current_share = np.clip(current_counts / max(current_counts.sum(), 1), PSI_MIN_SHARE, None)
+    return float(np.sum((current_share - reference_share) * np.log(current_share / reference_share)))
+
+
+def ks_test(reference_counts: np.ndarray, current_counts: np.ndarray) -> Dict[Text, float]:
+    """Two-sample Kolmogorov-Smirnov test on binned counts (asymptotic p-value)."""
+    n, m = reference_counts.sum(), current_counts.sum()
+    if not n or not m:
+        return {"statistic": 0.0, "p_value": 1.0}
+    statistic = float(np.max(np.abs(np.cumsum(reference_counts) / n - np.cumsum(current_counts) / m)))
+    return {"statistic": statistic, "p_value": float(kolmogorov(statistic * np.sqrt(n * m / (n + m))))}
+
+
+def chi_square_test(reference_counts: np.ndarray, current_counts: np.ndarray) -> Dict[Text, float]:
+    """Chi-square test of homogeneity on a 2 x categories contingency table."""
+    table = np.vstack([reference_counts, current_counts]).astype(float)
+    table = table[:, table.sum(axis=0) > 0]
+    if table.shape[1] < 2 or not table[0].sum() or not table[1].sum():
+        return {"statistic": 0.0, "p_value": 1.0}
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    statistic = float(np.sum((table - expected) ** 2 / expected))
+    return {"statistic": statistic, "p_value": float(chi2.sf(statistic, table.shape[1] - 1))}
+
+
+def drift_results(window: WindowSketch, threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+    """Run the drift tests of every sketched column.
+
+    Numerical columns use KS and categorical columns chi-square, like Evidently's
+    defaults; PSI is reported for both.
+
+    Args:
+        window (WindowSketch): Current window (it carries its reference sketch).
+        threshold (float): P-value below which a column is considered drifted.
+
+    Returns:
+        pd.DataFrame: One row per column with type, test, statistic, p_value, psi,
+            drift_detected and current_missing_share.
+    """
+    reference = window.reference
+    rows: List[Dict] = []
+
+    for column, sketch in reference.numerical.items():
+        reference_counts = np.asarray(sketch["counts"])
+        current_counts = window.numerical[column]
+        rows.append({
+            "column": column, "type": "num", "test": "K-S",
+            **ks_test(reference_counts, current_counts),
+            "psi": psi(reference_counts, current_counts),
+        })
+
+    for column, sketch in reference.categorical.items():
+        categories = sorted(set(sketch["counts"]) | set(window.categorical[column]))
+        reference_counts = np.array([sketch["counts"].get(c, 0) for c in categories])
+        current_counts = np.array([window.categorical[column].get(c, 0) for c in categories])
+        rows.append({
+            "column": column, "type": "cat", "test": "chi-square",
+            **chi_square_test(reference_counts, current_counts),
+            "psi": psi(reference_counts, current_counts),
+        })
+
+    results = pd.DataFrame(rows, columns=["column", "type", "test", "statistic", "p_value", "psi"])
+    results["drift_detected"] = results["p_value"] < threshold
+    results["current_missing_share"] = [window.missing[c] / window.rows if window.rows else 0.0 for c in results["column"]]
+    return results
+
+
+class DriftEngine:
+    """Streaming drift monitor: feed rows as they arrive, ask for drift results at any time."""
+
+    def __init__(self, reference: ReferenceSketch, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.reference = reference
+        self.threshold = threshold
+        self.window = WindowSketch(reference)
+
+    def update(self, rows: pd.DataFrame) -> None:
+        self.window.update(rows)
+
+    def reset(self) -> None:
+        """Start a new window (e.g. at the start of a new period)."""
+        self.window = WindowSketch(self.reference)
+
+    def results(self) -> pd.DataFrame:
+        return drift_results(self.window, self.threshold)
+
+
+def save_sketch(sketch, path: Path) -> None:
+    """Write a reference or window sketch as JSON, atomically."""
+    tmp_path = Path(path).with_name(f".{Path(path).name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf8") as sketch_f:
+        json.dump(sketch.to_dict(), sketch_f)
+    os.replace(tmp_path, path)
+
+
+def load_window(reports_dir: Path, period: Text) -> Optional[WindowSketch]:
+    """Load the window sketch of a period with its project's reference sketch, or None if missing."""
+    try:
+        with open(reports_dir / REFERENCE_SKETCH_NAME, encoding="utf8") as reference_f:
+            reference = ReferenceSketch.from_dict(json.load(reference_f))
+        with open(reports_dir / period / WINDOW_SKETCH_NAME, encoding="utf8") as window_f:
+            return WindowSketch.from_dict(reference, json.load(window_f))
+    except FileNotFoundError:
+        return None
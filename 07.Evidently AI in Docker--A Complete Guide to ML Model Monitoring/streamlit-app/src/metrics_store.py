@@ -0,0 +1,170 @@
+"""Headline numbers of every report, stored per project and period in SQLite.
+
+Report generation extracts a handful of numbers per report (drift share,
+per-column drift scores, MAE/MAPE, missing values) and writes them here, so
+trends across periods are one indexed query instead of parsing HTML.
+"""
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+import pandas as pd
+
+# (report, metric, column, value); column is "" for dataset-level metrics
+MetricRow = Tuple[Text, Text, Text, float]
+
+SCHEMA: Text = """
+CREATE TABLE IF NOT EXISTS metrics (
+    project TEXT NOT NULL,
+    period TEXT NOT NULL,
+    report TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    column_name TEXT NOT NULL DEFAULT '',
+    value REAL,
+    PRIMARY KEY (project, period, report, metric, column_name)
+) WITHOUT ROWID
+"""
+
+# Headline numbers per Evidently metric: (result key, stored metric name)
+REGRESSION_METRICS: List[Tuple[Text, Text]] = [
+    ("mean_error", "mean_error"),
+    ("mean_abs_error", "mae"),
+    ("mean_abs_perc_error", "mape"),
+    ("rmse", "rmse"),
+    ("r2_score", "r2_score"),
+]
+DATASET_DRIFT_METRICS: List[Tuple[Text, Text]] = [
+    ("share_of_drifted_columns", "share_of_drifted_columns"),
+    ("number_of_drifted_columns", "number_of_drifted_columns"),
+    ("dataset_drift", "dataset_drift"),
+]
+MISSING_VALUES_METRICS: List[Tuple[Text, Text]] = [
+    ("share_of_missing_values", "share_of_missing_values"),
+    ("share_of_rows_with_missing_values", "share_of_rows_with_missing_values"),
+    ("number_of_rows", "number_of_rows"),
+]
+
+
+def _number(value) -> Optional[float]:
+    # Evidently results hold numpy scalars and bools
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_metrics(report_name: Text, report_dict: Dict) -> List[MetricRow]:
+    """Pick the headline numbers out of `Report.as_dict()`.
+
+    Args:
+        report_name (Text): Report file name without suffix (e.g. 'data_drift').
+        report_dict (Dict): Output of `Report.as_dict()`.
+
+    Returns:
+        List[MetricRow]: Extracted numbers; metrics a report does not contain are skipped.
+    """
+    rows: List[MetricRow] = []
+
+    def add(metric: Text, column: Text, value) -> None:
+        number = _number(value)
+        if number is not None:
+            rows.append((report_name, metric, column, number))
+
+    for metric in report_dict.get("metrics", []):
+        name: Text = metric.get("metric", "")
+        result: Dict = metric.get("result") or {}
+
+        if name == "RegressionQualityMetric":
+            for key, stored in REGRESSION_METRICS:
+                add(stored, "", result.get(key))
+        elif name == "DatasetDriftMetric":
+            for key, stored in DATASET_DRIFT_METRICS:
+                add(stored, "", result.get(key))
+        elif name == "DataDriftTable":
+            for column, column_result in (result.get("drift_by_columns") or {}).items():
+                add("drift_score", column, column_result.get("drift_score"))
+                add("drift_detected", column, column_result.get("drift_detected"))
+        elif name == "ColumnDriftMetric":
+            add("drift_score", result.get("column_name", ""), result.get("drift_score"))
+            add("drift_detected", result.get("column_name", ""), result.get("drift_detected"))
+        elif name == "DatasetMissingValuesMetric":
+            for key, stored in MISSING_VALUES_METRICS:
+                add(stored, "", result.get(key))
+            for column, share in (result.get("share_of_missing_values_by_column") or {}).items():
+                add("share_of_missing_values", column, share)
+
+    return rows
+
+
+class MetricsStore:
+    """SQLite table of (project, period, report, metric, column) -> value."""
+
+    def __init__(self, path: Path, read_only: bool = False) -> None:
+        """
+        Args:
+            path (Path): SQLite database file.
+            read_only (bool): Only read from the store (the dashboard): the database is not
+                created, and a missing database loads as empty.
+        """
+        self.path = Path(path)
+        if not read_only:
+            with closing(self._connect()) as connection:
+                # WAL lets the dashboard read while the pipeline writes; the mode is kept in the file
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path), timeout=30)
+
+    def write_period(self, project: Text, period: Text, rows: Iterable[MetricRow]) -> None:
+        """Replace the stored metrics of the given reports of one period."""
+        rows = list(rows)
+        reports = sorted({row[0] for row in rows})
+        with closing(self._connect()) as connection:
+            with connection:  # one transaction
+                connection.executemany(
+                    "DELETE FROM metrics WHERE project = ? AND period = ? AND report = ?",
+                    [(project, period, report) for report in reports],
+                )
+                connection.executemany(
+                    "INSERT INTO metrics (project, period, report, metric, column_name, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(project, period, *row) for row in rows],
+                )
+
+    def has_period(self, project: Text, period: Text, reports: Iterable[Text]) -> bool:
+        """True if metrics of all given reports are stored for the period."""
+        if not self.path.exists():
+            return False
+        with closing(self._connect()) as connection:
+            stored = {
+                report for (report,) in connection.execute(
+                    "SELECT DISTINCT report FROM metrics WHERE project = ? AND period = ?", (project, period)
+                )
+            }
+        return set(reports) <= stored
+
+    def load(self, project: Text, start: Optional[Text] = None, end: Optional[Text] = None) -> pd.DataFrame:
+        """Load all metrics of a project, optionally limited to periods starting between `start` and `end`.
+
+        Returns:
+            pd.DataFrame: Columns period, report, metric, column_name and value, sorted by period.
+        """
+        query = "SELECT period, report, metric, column_name, value FROM metrics WHERE project = ?"
+        params: List = [project]
+        # Period names start with their first day, so string comparison is chronological
+        if start:
+            query += " AND period >= ?"
+            params.append(start)
+        if end:
+            query += " AND period <= ?"
+            params.append(f"{end}~")
+        if not self.path.exists():
+            return pd.DataFrame(columns=["period", "report", "metric", "column_name", "value"])
+        with closing(self._connect()) as connection:
+            return pd.read_sql_query(query + " ORDER BY period", connection, params=params)
@@ -0,0 +1,230 @@
+"""Side HTTP endpoint that serves reports as precompressed static files.
+
+Evidently reports are several MB of inline JavaScript. Instead of pushing them
+through the Streamlit websocket, the app embeds large reports by URL and the
+browser fetches them from here, gzip or brotli compressed. Compressed variants
+are written once per report version to a cache directory and reused.
+
+Precompress all reports ahead of time (e.g. at image build time) with:
+    python -m src.server
+"""
+import argparse
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+from urllib.parse import quote
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+from src.catalog import REPORTS_DIR_NAME
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL: int = 9
+BROTLI_QUALITY: int = 11
+
+# Served encodings in order of preference
+ENCODINGS: Dict[Text, Text] = {"gzip": ".gz"}
+if brotli is not None:
+    ENCODINGS = {"br": ".br", **ENCODINGS}
+
+
+def compress(source: Path, target: Path, encoding: Text) -> None:
+    """Write a compressed copy of `source` to `target` atomically."""
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(source, "rb") as source_f:
+        data: bytes = source_f.read()
+    if encoding == "br":
+        compressed: bytes = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    with open(tmp_path, "wb") as tmp_f:
+        tmp_f.write(compressed)
+    os.replace(tmp_path, target)
+
+
+def accepted_encodings(header: Optional[Text]) -> List[Text]:
+    """Parse an Accept-Encoding header into the encodings with a non-zero q-value."""
+    accepted: List[Text] = []
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if name:
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+class ReportServer:
+    """Static file server for the projects directory with precompressed variants."""
+
+    def __init__(
+        self,
+        projects_dir: Path,
+        cache_dir: Path,
+        host: Text = "0.0.0.0",
+        port: int = 8502,
+        public_url: Optional[Text] = None,
+    ) -> None:
+        """
+        Args:
+            projects_dir (Path): Directory containing the projects; only their reports are served.
+            cache_dir (Path): Where compressed variants are stored.
+            host (Text): Interface to listen on.
+            port (int): Port to listen on.
+            public_url (Optional[Text]): Base URL under which browsers reach the server.
+                Defaults to `http://localhost:<port>`.
+        """
+        self.projects_dir = Path(projects_dir).resolve()
+        self.cache_dir = Path(cache_dir)
+        self.host = host
+        self.port = port
+        self.public_url = (public_url or f"http://localhost:{port}").rstrip("/")
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    def url_for(self, path: Path) -> Text:
+        """Build the URL of a report; the version query string busts browser caches on regeneration."""
+        relative_path = Path(path).resolve().relative_to(self.projects_dir)
+        return f"{self.public_url}/{quote(relative_path.as_posix())}?v={os.stat(path).st_mtime_ns}"
+
+    def resolve(self, url_path: Text) -> Optional[Path]:
+        """Map a request path to a report file (`<project>/reports/...`), or None.
+
+        Data, models and anything else in the projects directory are not served.
+        """
+        path = (self.projects_dir / unquote(url_path).lstrip("/")).resolve()
+        try:
+            parts = path.relative_to(self.projects_dir).parts
+        except ValueError:
+            return None
+        if len(parts) < 3 or parts[1] != REPORTS_DIR_NAME or any(part.startswith(".") for part in parts):
+            return None
+        if not path.is_file():
+            return None
+        return path
+
+    def variant(self, path: Path, encoding: Text) -> Path:
+        """Return the compressed variant of a file, creating it if it is missing or outdated."""
+        stat = os.stat(path)
+        key: Text = hashlib.sha1(str(path).encode("utf8")).hexdigest()[:16]
+        target = self.cache_dir / f"{key}-{stat.st_mtime_ns}-{stat.st_size}{ENCODINGS[encoding]}"
+        if not target.exists():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            compress(path, target, encoding)
+            # Drop variants of earlier versions of the same file
+            for stale in self.cache_dir.glob(f"{key}-*{ENCODINGS[encoding]}"):
+                if stale != target:
+                    stale.unlink(missing_ok=True)
+        return target
+
+    def precompress(self) -> int:
+        """Create compressed variants of every report.
+
+        Returns:
+            int: Number of files processed.
+        """
+        count = 0
+        for path in sorted(self.projects_dir.glob(f"*/{REPORTS_DIR_NAME}/**/*.html")):
+            for encoding in ENCODINGS:
+                self.variant(path.resolve(), encoding)
+            count += 1
+        return count
+
+    def start(self) -> "ReportServer":
+        """Start serving in a daemon thread."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self) -> None:
+                self.send_report(head=True)
+
+            def do_GET(self) -> None:
+                self.send_report(head=False)
+
+            def send_report(self, head: bool) -> None:
+                path = server.resolve(urlsplit(self.path).path)
+                if path is None:
+                    self.send_error(404)
+                    return
+
+                body_path, encoding = server.choose(path, self.headers.get("Accept-Encoding"))
+                stat = os.stat(path)
+                etag: Text = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding or "identity"}"'
+
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+                self.send_header("Content-Length", str(os.path.getsize(body_path)))
+                self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Cache-Control", "public, max-age=86400")
+                self.send_header("ETag", etag)
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                self.end_headers()
+                if not head:
+                    with open(body_path, "rb") as body_f:
+                        try:
+                            shutil.copyfileobj(body_f, self.wfile)
+                        except (BrokenPipeError, ConnectionResetError):
+                            # The browser navigated away mid-download
+                            pass
+
+            def log_message(self, format: Text, *args) -> None:
+                logger.debug(format, *args)
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        thread = threading.Thread(target=self._httpd.serve_forever, name="report-server", daemon=True)
+        thread.start()
+        logger.info("Serving reports from %s at %s", self.projects_dir, self.public_url)
+        return self
+
+    def choose(self, path: Path, accept_encoding: Optional[Text]) -> Tuple[Path, Optional[Text]]:
+        """Pick the best precompressed variant the client accepts, falling back to the plain file."""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in accepted:
+                try:
+                    return self.variant(path, encoding), encoding
+                except OSError as e:
+                    logger.warning("Could not compress %s: %s", path, e)
+        return path, None
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects-dir", default=os.environ.get("PROJECTS_DIR", "../projects"))
+    parser.add_argument("--cache-dir", default=os.environ.get("REPORT_CACHE_DIR", ".report_cache"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    report_server = ReportServer(Path(args.projects_dir), Path(args.cache_dir))
+    logger.info("Precompressed %d reports (%s)", report_server.precompress(), ", ".join(ENCODINGS))
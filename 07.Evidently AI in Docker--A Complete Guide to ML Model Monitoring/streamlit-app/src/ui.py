@@ -1,12 +1,15 @@
 import os
 from pathlib import Path
 from PIL import Image
+import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
-from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Text
 
+from src.cache import ReportCache
+from src.server import ReportServer
 from src.utils import EntityNotFoundError
 from src.utils import get_report_name
 from src.utils import period_dir_to_dates_range
@@ -138,51 +141,156 @@ def display_header(project_name: Text, period: Text, report_name: Text) -> None:
     st.caption(f"Period: {dates_range}")
 
 
-@st.cache_data
-def display_report(report_path: Path) -> List[Text]:
+def display_drift_summary(drift_results: pd.DataFrame, rows: int) -> None:
+    """Display drift test results computed from the period's sketches.
+
+    Args:
+        drift_results (pd.DataFrame): Output of `src.drift.drift_results`.
+        rows (int): Number of rows in the current window.
+    """
+
+    drifted: int = int(drift_results["drift_detected"].sum())
+    with st.expander(f"⚡ Drift summary: {drifted} of {len(drift_results)} columns drifted"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Share of drifted columns", f"{drifted / len(drift_results):.0%}")
+        col2.metric("Max PSI", f"{drift_results['psi'].max():.3f}")
+        col3.metric("Rows in period", f"{rows:,}")
+        st.dataframe(
+            drift_results.style.format(
+                {"statistic": "{:.3f}", "p_value": "{:.4f}", "psi": "{:.3f}", "current_missing_share": "{:.1%}"}
+            ),
+            use_container_width=True,
+        )
+
+
+def _trend(metrics: pd.DataFrame, report: Text, metric: Text) -> pd.DataFrame:
+    """Pivot one metric to a frame indexed by period start, one column per data column."""
+    selected = metrics[(metrics["report"] == report) & (metrics["metric"] == metric)]
+    trend = selected.pivot_table(index="period", columns="column_name", values="value", aggfunc="last")
+    trend.index = pd.to_datetime(trend.index.str.split("_").str[0])
+    return trend.rename(columns={"": metric})
+
+
+def display_trends(metrics: pd.DataFrame) -> None:
+    """Display metric trends across periods.
+
+    Args:
+        metrics (pd.DataFrame): Output of `src.metrics_store.MetricsStore.load`.
+
+    Raises:
+        EntityNotFoundError: If there are no metrics.
+    """
+
+    if metrics.empty:
+        raise EntityNotFoundError("🔍 No metrics found. Generate reports with the project pipeline first.")
+
+    st.header("Trends")
+    st.caption(f"{metrics['period'].nunique()} periods")
+
+    st.subheader("📈 Data drift")
+    st.line_chart(_trend(metrics, "data_drift", "share_of_drifted_columns"))
+
+    drift_scores = _trend(metrics, "data_drift", "drift_score")
+    if not drift_scores.empty:
+        columns: List[Text] = st.multiselect(
+            "Drift score (p-value) per column", options=list(drift_scores.columns), default=list(drift_scores.columns)
+        )
+        st.line_chart(drift_scores[columns])
+
+    psi = _trend(metrics, "sketch", "psi")
+    if not psi.empty:
+        st.caption("PSI per column (from sketches)")
+        st.line_chart(psi)
+
+    st.subheader("🎯 Model performance")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("MAE")
+        st.line_chart(_trend(metrics, "model_performance", "mae"))
+    with col2:
+        st.caption("MAPE")
+        st.line_chart(_trend(metrics, "model_performance", "mape"))
+    st.caption("Target and prediction drift score (p-value)")
+    st.line_chart(_trend(metrics, "target_drift", "drift_score"))
+
+    st.subheader("🧹 Data quality")
+    st.caption("Share of missing values")
+    st.line_chart(_trend(metrics, "data_quality", "share_of_missing_values"))
+
+    with st.expander("All metrics"):
+        st.dataframe(metrics, use_container_width=True)
+
+
+def display_report_part(
+    report_path: Path,
+    report_cache: ReportCache,
+    report_server: Optional[ReportServer] = None,
+    inline_max_bytes: int = 1 << 20,
+) -> None:
+    """Display a single report file.
+
+    Reports larger than `inline_max_bytes` are embedded by URL from the report
+    server (compressed, cached by the browser); smaller ones, or all of them
+    when no server is running, are inlined from the report cache.
+
+    Args:
+        report_path (Path): Report file path.
+        report_cache (ReportCache): Cache of inlined report contents.
+        report_server (Optional[ReportServer]): Server for large reports.
+        inline_max_bytes (int): Largest report size that is inlined.
+    """
+
+    if report_server is not None and os.path.getsize(report_path) > inline_max_bytes:
+        components.iframe(report_server.url_for(report_path), width=1000, height=1200, scrolling=True)
+    else:
+        components.html(report_cache.get(report_path), width=1000, height=1200, scrolling=True)
+
+
+def display_report(
+    report_path: Path,
+    report_cache: ReportCache,
+    report_server: Optional[ReportServer] = None,
+    inline_max_bytes: int = 1 << 20,
+) -> None:
     """Display report.
 
+    A complex report (= directory) gets a selector of its parts, and only
+    the selected part is loaded.
+
     Args:
-        report (Path): Report path.
+        report_path (Path): Report path.
+        report_cache (ReportCache): Cache of inlined report contents.
+        report_server (Optional[ReportServer]): Server for large reports.
+        inline_max_bytes (int): Largest report size that is inlined.
 
-    Returns:
-        List[Text]: Report parts content - list report part contents.
+    Raises:
+        EntityNotFoundError: If the report does not exist.
     """
 
-    # If a report is file then read and display the report
+    # If a report is file then display the report
     if report_path.is_file():
-        with open(report_path, encoding="utf8") as report_f:
-            report: Text = report_f.read()
-            components.html(report, width=1000, height=1200, scrolling=True)
-        return [report]
+        display_report_part(report_path, report_cache, report_server, inline_max_bytes)
 
     # If a report is complex report (= directory) then
     elif report_path.is_dir():
         # list report parts
         report_parts: List[Path] = sorted(
-            list(map(
-                lambda report_part: report_path / report_part, 
-                os.listdir(report_path))
-                )
-            )
-        tab_names: List[Text] = map(get_report_name, report_parts)
-        tab_names_formatted = [f"📈 {name}" for name in tab_names]
-        
-        # create tabs
-        tabs: Iterable[object] = st.tabs(tab_names_formatted)
-        report_contents: List[Text] = []
-
-        # read each report part and display in separate tab
-        for tab, report_part_path in zip(tabs, report_parts):
-            with tab:
-                with open(report_part_path) as report_part_f:
-                    report_part_content: Text = report_part_f.read()
-                    report_contents.append(report_part_content)
-                    components.html(
-                        report_part_content, width=1000, height=1200, scrolling=True
-                    )
-
-        return report_contents
-    
-    else: 
-        return EntityNotFoundError("🔍 No reports found")
+            report_path / report_part
+            for report_part in os.listdir(report_path)
+            if not report_part.startswith(".")
+        )
+        if not report_parts:
+            raise EntityNotFoundError("🔍 No reports found")
+
+        # select one part instead of tabs: st.tabs would render (and send) every part
+        selected_part: Path = st.radio(
+            label="Report part",
+            options=report_parts,
+            format_func=lambda report_part: f"📈 {get_report_name(report_part)}",
+            horizontal=True,
+            label_visibility="collapsed",
+        )
+        display_report_part(selected_part, report_cache, report_server, inline_max_bytes)
+
+    else:
+        raise EntityNotFoundError("🔍 No reports found")
@@ -0,0 +1,122 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Features in the order the model was trained on (see titanic_model.py)
+FEATURES = ['Pclass', 'Sex', 'Age', 'Siblings/Spouses Aboard', 'Parents/Children Aboard', 'Fare']
+
+# Kaggle-style column names accepted as aliases
+COLUMN_ALIASES = {'SibSp': 'Siblings/Spouses Aboard', 'Parch': 'Parents/Children Aboard'}
+
+# Same encoding as titanic_model.py
+SEX_MAPPING = {'male': 1, 'female': 0}
+
+N_WORKERS = os.cpu_count() or 1
+
+
+def prepare_features(df, fill_values):
+    """
+    Apply the training preprocessing to raw passenger rows.
+
+    Args:
+        df: DataFrame with the FEATURES columns (or their aliases); Sex may be 'male'/'female' or 1/0
+        fill_values: Values used for missing features (the training medians, see the model manifest)
+
+    Returns:
+        DataFrame: Model input with the FEATURES columns in training order
+    """
+    df = df.rename(columns=COLUMN_ALIASES)
+    missing = [f for f in FEATURES if f not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    X = df[FEATURES].copy()
+    if not pd.api.types.is_numeric_dtype(X['Sex']):
+        X['Sex'] = X['Sex'].str.strip().str.lower().map(SEX_MAPPING)
+    # Sex has no median in the training data; unknown values fall back to its majority class (male)
+    return X.fillna(dict(fill_values, Sex=SEX_MAPPING['male'])).astype(float)
+
+
+def read_chunks(source, chunk_size=100_000):
+    """
+    Yield raw DataFrame chunks from a CSV or Parquet file.
+
+    Args:
+        source: File path or file-like object (e.g. a Streamlit upload)
+        chunk_size: Rows per chunk
+
+    Yields:
+        DataFrame: Next chunk of rows
+    """
+    name = str(getattr(source, "name", source)).lower()
+    if name.endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+
+def score_chunks(model, chunks, fill_values, n_workers=N_WORKERS):
+    """
+    Score chunks with model.predict_proba on a thread pool, preserving input order.
+
+    At most 2 * n_workers chunks are in flight, so memory stays bounded on large files.
+
+    Args:
+        model: Trained classifier
+        chunks: Iterable of raw DataFrame chunks
+        fill_values: Values used for missing features
+        n_workers: Number of worker threads
+
+    Yields:
+        tuple: (raw chunk, survival probabilities)
+    """
+    def score(chunk):
+        return model.predict_proba(prepare_features(chunk, fill_values))[:, 1]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(score, chunk)))
+            if len(pending) >= 2 * n_workers:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+def score_file(model, source, output_path, fill_values, chunk_size=100_000, n_workers=N_WORKERS,
+               progress_callback=None):
+    """
+    Score a passenger manifest and write it back with a 'Survival Probability' column.
+
+    Args:
+        model: Trained classifier
+        source: CSV/Parquet path or file-like object
+        output_path: CSV file the scored rows are written to
+        fill_values: Values used for missing features
+        chunk_size: Rows per chunk
+        n_workers: Number of worker threads
+        progress_callback: Optional function called with the rows scored so far
+
+    Returns:
+        dict: rows, seconds and rows_per_second
+    """
+    start = time.perf_counter()
+    rows = 0
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        for i, (chunk, probabilities) in enumerate(score_chunks(model, read_chunks(source, chunk_size), fill_values, n_workers)):
+            chunk.assign(**{'Survival Probability': probabilities}).to_csv(f, header=(i == 0), index=False)
+            rows += len(chunk)
+            if progress_callback:
+                progress_callback(rows)
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else 0.0}
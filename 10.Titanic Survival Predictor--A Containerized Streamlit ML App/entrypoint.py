@@ -0,0 +1,21 @@
+"""Start the Streamlit app with the model already loaded and warmed up.
+
+Streamlit only runs main.py when the first session connects, so loading the
+model there makes the first user wait for it. This loads, verifies and warms up
+the model in the server process first; main.py then gets the same instance
+from model_loader.
+
+Run with:  python entrypoint.py [streamlit run options]
+"""
+import logging
+import sys
+
+from streamlit.web import cli
+
+from model_loader import get_loaded_model
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    get_loaded_model()
+    sys.argv = ["streamlit", "run", "main.py", *sys.argv[1:]]
+    sys.exit(cli.main())
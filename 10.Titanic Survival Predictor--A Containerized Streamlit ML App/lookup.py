@@ -0,0 +1,121 @@
+"""Precompute survival probabilities for every input the app's widgets can produce.
+
+The forest only compares each feature against its split thresholds, so grid
+values that fall between the same two thresholds always get the same
+prediction. Each widget axis is collapsed to one representative value per
+threshold interval. The model is then evaluated once over the reduced grid,
+and the result is stored as a compact array indexed per axis.
+
+Run with:  python lookup.py  (writes titanic_model.lookup.npz)
+"""
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch import FEATURES
+from model_loader import MODEL_PATH, file_sha256, load_model
+
+LOOKUP_PATH = "titanic_model.lookup.npz"
+
+# Reachable widget values per feature (in FEATURES order), see main.py
+GRID = {
+    'Pclass': np.arange(1, 4),
+    'Sex': np.arange(0, 2),
+    'Age': np.arange(0, 81),
+    'Siblings/Spouses Aboard': np.arange(0, 11),
+    'Parents/Children Aboard': np.arange(0, 11),
+    'Fare': np.arange(0, 501),
+}
+
+CHUNK_SIZE = 500_000
+
+logger = logging.getLogger(__name__)
+
+
+def _split_thresholds(model):
+    """Sorted unique split thresholds of every feature across all trees."""
+    thresholds = [[] for _ in FEATURES]
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_split = tree.feature >= 0
+        for feature, threshold in zip(tree.feature[is_split], tree.threshold[is_split]):
+            thresholds[feature].append(threshold)
+    return [np.unique(t) for t in thresholds]
+
+
+def build_table(model):
+    """
+    Evaluate the model over the widget grid, collapsed to one value per threshold interval.
+
+    Returns:
+        dict: 'table' (survival probabilities, one axis per feature) and
+              'index_<i>' arrays mapping each grid value of feature i to its table axis position
+    """
+    axes, index = [], []
+    for values, thresholds in zip(GRID.values(), _split_thresholds(model)):
+        # Trees compare float32 inputs with `x <= threshold`
+        interval = np.searchsorted(thresholds, values.astype(np.float32).astype(float), side='left')
+        _, first, position = np.unique(interval, return_index=True, return_inverse=True)
+        axes.append(values[first])
+        index.append(position.astype(np.int16))
+
+    mesh = np.meshgrid(*axes, indexing='ij')
+    X = pd.DataFrame({f: m.ravel().astype(float) for f, m in zip(FEATURES, mesh)})
+    probabilities = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), CHUNK_SIZE):
+        probabilities[start:start + CHUNK_SIZE] = model.predict_proba(X.iloc[start:start + CHUNK_SIZE])[:, 1]
+
+    result = {"table": probabilities.reshape([len(a) for a in axes])}
+    result.update({f"index_{i}": idx for i, idx in enumerate(index)})
+    return result
+
+
+class PredictionTable:
+    """O(1) survival probability lookups for inputs on the widget grid."""
+
+    def __init__(self, path=LOOKUP_PATH):
+        with np.load(path) as data:
+            self.model_sha256 = str(data["model_sha256"])
+            self.table = data["table"]
+            self.index = [data[f"index_{i}"] for i in range(len(FEATURES))]
+        self.offsets = [int(values[0]) for values in GRID.values()]
+
+    def lookup(self, row):
+        """
+        Return the survival probability for one prepared feature row, or None if it is off the grid.
+
+        Args:
+            row: Sequence of feature values in FEATURES order (Sex already mapped to 1/0)
+        """
+        position = []
+        for value, offset, index in zip(row, self.offsets, self.index):
+            i = value - offset
+            if not 0 <= i < len(index) or i != int(i):
+                return None
+            position.append(index[int(i)])
+        return float(self.table[tuple(position)])
+
+
+def load_table(path=LOOKUP_PATH, model_path=MODEL_PATH):
+    """Load the lookup table if it exists and was built from the current model, else return None."""
+    try:
+        table = PredictionTable(path)
+    except FileNotFoundError:
+        return None
+    if table.model_sha256 != file_sha256(model_path):
+        logger.warning("%s was built for a different model; using the live model instead", path)
+        return None
+    return table
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    model, _ = load_model()
+    model.set_params(n_jobs=-1)
+    start = time.perf_counter()
+    lookup = build_table(model)
+    np.savez_compressed(LOOKUP_PATH, model_sha256=file_sha256(MODEL_PATH), **lookup)
+    logger.info("Built %s with %s cells (%s) in %.1fs", LOOKUP_PATH, f"{lookup['table'].size:,}",
+                "x".join(map(str, lookup['table'].shape)), time.perf_counter() - start)
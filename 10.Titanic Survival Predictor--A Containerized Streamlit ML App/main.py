@@ -1,13 +1,50 @@
+import logging
+import os
+import tempfile
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import joblib
 
-# Load the trained model
-model = joblib.load('titanic_model.pkl')
+from batch import N_WORKERS, prepare_features, score_file
+from lookup import load_table
+from model_loader import get_loaded_model
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+# Batch scoring only reads server-side files from this directory (and its subdirectories)
+BATCH_DATA_DIR = Path(os.environ.get("BATCH_DATA_DIR", "data")).resolve()
+BATCH_SUFFIXES = (".csv", ".parquet", ".pq")
+
+
+def list_batch_files(data_dir=BATCH_DATA_DIR):
+    """Return the CSV/Parquet files under data_dir (relative paths), skipping links that lead outside it."""
+    if not data_dir.is_dir():
+        return []
+    return sorted(str(path.relative_to(data_dir)) for path in data_dir.rglob("*")
+                  if path.suffix.lower() in BATCH_SUFFIXES and path.is_file()
+                  and path.resolve().is_relative_to(data_dir))
+
+
+# Load, validate and warm up the trained model (and its manifest) once per process; all sessions share it.
+# Under entrypoint.py this already happened at server start.
+@st.cache_resource
+def get_model():
+    return get_loaded_model()
+
+
+# Precomputed predictions for the widget grid (built with `python lookup.py`); None if absent
+@st.cache_resource
+def get_lookup_table():
+    return load_table()
+
 
 # Set Streamlit Page Config (MUST be the first command)
 st.set_page_config(page_title="Titanic Survival Prediction", layout="wide")
 
+model, model_manifest = get_model()
+lookup_table = get_lookup_table()
+
 # Custom CSS for Styling
 st.markdown(
     """
@@ -24,6 +61,62 @@ st.markdown(
 st.markdown('<div class="title">Titanic Survival Prediction</div>', unsafe_allow_html=True)
 st.markdown('<div class="subtitle">Enter passenger details below to predict survival chances.</div>', unsafe_allow_html=True)
 
+mode = st.radio("Mode", ["Single passenger", "Batch scoring"], horizontal=True)
+
+
+def show_batch_scoring():
+    st.write("Score a passenger manifest (CSV or Parquet) with columns "
+             "Pclass, Sex, Age, Siblings/Spouses Aboard (or SibSp), Parents/Children Aboard (or Parch) and Fare.")
+    source_type = st.radio("Source", ["Upload file", "Server path"], horizontal=True)
+    if source_type == "Upload file":
+        source = st.file_uploader("Passenger manifest", type=["csv", "parquet"])
+    else:
+        files = list_batch_files()
+        if not files:
+            st.info(f"No CSV or Parquet files in {BATCH_DATA_DIR} (set BATCH_DATA_DIR to change it).")
+        path = st.selectbox(f"File in {BATCH_DATA_DIR}", files) if files else None
+        source = str(BATCH_DATA_DIR / path) if path else None
+
+    col1, col2 = st.columns(2)
+    with col1:
+        chunk_size = st.number_input("Rows per chunk", 1_000, 1_000_000, 100_000, step=10_000)
+    with col2:
+        n_workers = st.number_input("Worker threads", 1, max(N_WORKERS, 1) * 2, N_WORKERS)
+
+    if source is None or not st.button("Score File"):
+        return
+    if isinstance(source, str) and not os.path.exists(source):
+        st.error(f"⚠️ File not found: {source}")
+        return
+
+    # One output file per session, reused across runs
+    if "batch_output_path" not in st.session_state:
+        fd, st.session_state.batch_output_path = tempfile.mkstemp(prefix="titanic_predictions_", suffix=".csv")
+        os.close(fd)
+    output_path = st.session_state.batch_output_path
+    progress = st.empty()
+    try:
+        stats = score_file(model, source, output_path, model_manifest["fill_values"],
+                           chunk_size=int(chunk_size), n_workers=int(n_workers),
+                           progress_callback=lambda rows: progress.text(f"Scored {rows:,} rows..."))
+    except Exception as e:
+        st.error(f"⚠️ Prediction Error: {e}")
+        return
+
+    progress.empty()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows", f"{stats['rows']:,}")
+    col2.metric("Time", f"{stats['seconds']:.2f} s")
+    col3.metric("Throughput", f"{stats['rows_per_second']:,.0f} rows/s")
+    st.dataframe(pd.read_csv(output_path, nrows=100))
+    with open(output_path, "rb") as f:
+        st.download_button("Download Predictions", f, file_name="titanic_predictions.csv", mime="text/csv")
+
+
+if mode == "Batch scoring":
+    show_batch_scoring()
+    st.stop()
+
 # Input Fields
 with st.container():
     col1, col2 = st.columns(2)
@@ -42,14 +135,16 @@ with st.container():
 if st.button("Predict Survival"):
     with st.spinner("Predicting..."):
         try:
-            sex_binary = 1 if sex == 'female' else 0
-            input_data = pd.DataFrame([[pclass, sex_binary, age, sibsp, parch, fare]], 
-                                      columns=['Pclass', 'Sex', 'Age', 'Siblings/Spouses Aboard', 
-                                               'Parents/Children Aboard', 'Fare'])
-
-            # Make Prediction
-            prediction = model.predict(input_data)
-            result = "Survived" if prediction[0] == 1 else "Did not survive"
+            input_data = prepare_features(pd.DataFrame([[pclass, sex, age, sibsp, parch, fare]],
+                                                       columns=['Pclass', 'Sex', 'Age', 'Siblings/Spouses Aboard',
+                                                                'Parents/Children Aboard', 'Fare']),
+                                          model_manifest["fill_values"])
+
+            # Make Prediction: O(1) table lookup, falling back to the live model off the grid
+            probability = lookup_table.lookup(input_data.iloc[0].tolist()) if lookup_table else None
+            if probability is None:
+                probability = model.predict_proba(input_data)[0, 1]
+            result = "Survived" if probability > 0.5 else "Did not survive"
 
             # Display Result
             if result == "Survived":
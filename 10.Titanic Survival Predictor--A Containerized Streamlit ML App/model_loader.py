@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import joblib
+import pandas as pd
+import sklearn
+
+from batch import FEATURES, prepare_features
+
+MODEL_PATH = "titanic_model.pkl"
+MANIFEST_PATH = "titanic_model.json"
+
+# Rows in the dummy batch used to warm the model up
+WARMUP_ROWS = 256
+
+logger = logging.getLogger(__name__)
+
+# Model and manifest loaded by get_loaded_model, shared by everything in the process
+_loaded = None
+_loaded_lock = threading.Lock()
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_artifact(model_path, manifest):
+    """
+    Check the model file against the size and SHA-256 recorded by titanic_model.py.
+
+    Raises:
+        ValueError: If the file does not match the manifest
+    """
+    expected = manifest["artifact"]
+    size = os.path.getsize(model_path)
+    if size != expected["size"]:
+        raise ValueError(f"{model_path} is {size} bytes, manifest expects {expected['size']}")
+    if file_sha256(model_path) != expected["sha256"]:
+        raise ValueError(f"{model_path} does not match the SHA-256 in its manifest")
+    if manifest["sklearn_version"] != sklearn.__version__:
+        logger.warning("Model was trained with scikit-learn %s but %s is installed",
+                       manifest["sklearn_version"], sklearn.__version__)
+
+
+def validate_schema(model, schema):
+    """
+    Check that a loaded model matches its stored feature schema.
+
+    Args:
+        model: Loaded classifier
+        schema: Manifest dict with model_type, features and classes
+
+    Raises:
+        ValueError: If the model does not match the schema
+    """
+    problems = []
+    if type(model).__name__ != schema["model_type"]:
+        problems.append(f"model type {type(model).__name__} != {schema['model_type']}")
+    features = list(getattr(model, "feature_names_in_", []))
+    if features != schema["features"]:
+        problems.append(f"features {features} != {schema['features']}")
+    if schema["features"] != FEATURES:
+        problems.append(f"schema features {schema['features']} != app features {FEATURES}")
+    classes = [int(c) for c in getattr(model, "classes_", [])]
+    if classes != schema["classes"]:
+        problems.append(f"classes {classes} != {schema['classes']}")
+    if problems:
+        raise ValueError("Model does not match its schema: " + "; ".join(problems))
+
+
+def warm_up(model, fill_values, rows=WARMUP_ROWS):
+    """Run a dummy batch through the model so the first real prediction is not slowed down."""
+    dummy = pd.DataFrame([dict(fill_values, Sex='male')] * rows)
+    model.predict_proba(prepare_features(dummy, fill_values))
+
+
+def load_model(model_path=MODEL_PATH, manifest_path=MANIFEST_PATH):
+    """
+    Verify the model file against its manifest, load it, validate its schema
+    and warm it up, logging each step's time.
+
+    Returns:
+        tuple: (trained classifier, manifest dict); the manifest's fill_values
+        must be passed to prepare_features for the model's inputs
+    """
+    start = time.perf_counter()
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    verify_artifact(model_path, manifest)
+    verified = time.perf_counter()
+
+    model = joblib.load(model_path)
+    loaded = time.perf_counter()
+
+    validate_schema(model, manifest)
+    warm_up(model, manifest["fill_values"])
+    warmed = time.perf_counter()
+
+    logger.info("Verified %s in %.3fs, loaded in %.3fs, validated and warmed up in %.3fs "
+                "(accuracy %.3f, trained on %s rows)", model_path, verified - start, loaded - verified,
+                warmed - loaded, manifest["metrics"]["accuracy"], manifest["training_data"]["rows"])
+    return model, manifest
+
+
+def get_loaded_model():
+    """
+    Return the process-wide (model, manifest), loading it on the first call.
+
+    entrypoint.py calls this before Streamlit starts serving, so the app finds
+    the model already verified and warmed up.
+    """
+    global _loaded
+    with _loaded_lock:
+        if _loaded is None:
+            _loaded = load_model()
+        return _loaded
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    load_model()
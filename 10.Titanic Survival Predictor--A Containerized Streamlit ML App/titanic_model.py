@@ -1,43 +1,153 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split 
-from sklearn.ensemble import RandomForestClassifier 
-from sklearn.metrics import accuracy_score 
-import joblib
+"""Train the Titanic survival model offline and write it with a manifest.
+
+Examples:
+    python titanic_model.py
+    python titanic_model.py --search --n-jobs -1
+    python titanic_model.py --data /path/to/titanic.csv --compress 9
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
 import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+
+from batch import FEATURES, prepare_features
 
 warnings.filterwarnings('ignore')  # Ignore warnings for cleaner output
 
-# Load dataset
-url = "https://web.stanford.edu/class/archive/cs/cs109/cs109.1166/stuff/titanic.csv"
-data = pd.read_csv(url)
+# Vendored copy of the Kaggle Titanic training set (same as 15.AIML_Model/datasets/titanic.csv)
+DATA_PATH = "titanic.csv"
+MODEL_PATH = "titanic_model.pkl"
+MANIFEST_PATH = "titanic_model.json"
+
+# Preprocessed feature matrices, keyed by CSV content and PREPROCESS_VERSION
+CACHE_DIR = Path(os.environ.get("FEATURE_CACHE_DIR", ".cache"))
+PREPROCESS_VERSION = 1
+
+PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 6, 10],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", None],
+}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_features(data_path):
+    """
+    Return (X, y, fill_values) for a training CSV, reusing the cached matrix when the CSV is unchanged.
+
+    Sex is mapped to 1/0 and missing values are filled with the column medians,
+    using the same prepare_features that the app applies at prediction time.
+    """
+    data_hash = file_sha256(data_path)
+    cache_path = CACHE_DIR / f"titanic_features-{data_hash[:16]}-v{PREPROCESS_VERSION}.joblib"
+    if cache_path.exists():
+        return joblib.load(cache_path) + (data_hash,)
+
+    data = pd.read_csv(data_path)
+    print("Columns in the dataset:", list(data.columns))
+
+    # Medians are computed on the raw columns; Sex is categorical and handled by prepare_features
+    raw = prepare_features(data, fill_values={})
+    fill_values = {f: float(raw[f].median()) for f in FEATURES if f != 'Sex'}
+    X = prepare_features(data, fill_values=fill_values)
+    y = data['Survived'].to_numpy()
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    joblib.dump((X, y, fill_values), tmp_path)
+    os.replace(tmp_path, cache_path)
+    return X, y, fill_values, data_hash
+
+
+def train(X_train, y_train, n_jobs, search, cv, random_state):
+    """Fit a RandomForest, optionally picking its parameters with a cross-validated grid search."""
+    model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs)
+    if not search:
+        return model.fit(X_train, y_train), None
+
+    grid = GridSearchCV(model, PARAM_GRID, cv=cv, n_jobs=n_jobs, scoring="accuracy")
+    grid.fit(X_train, y_train)
+    return grid.best_estimator_, {"best_params": grid.best_params_, "best_cv_accuracy": grid.best_score_}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_PATH, help="Local titanic CSV (no network access needed)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Cores used for training (-1 = all)")
+    parser.add_argument("--search", action="store_true", help="Cross-validated parameter search")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--compress", type=int, default=3, help="zlib level of the saved model (0-9)")
+    parser.add_argument("--random-state", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    timings = {}
+    start = time.perf_counter()
+    X, y, fill_values, data_hash = load_features(args.data)
+    timings["features_s"] = time.perf_counter() - start
 
-# Check dataset columns
-print("Columns in the dataset:", data.columns)
+    # Split dataset
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=args.random_state)
 
-# Convert 'Sex' column to numerical values (0 for 'female', 1 for 'male')
-data['Sex'] = data['Sex'].map({'male': 1, 'female': 0})
+    # Train model
+    start = time.perf_counter()
+    model, search_results = train(X_train, y_train, args.n_jobs, args.search, args.cv, args.random_state)
+    timings["fit_s"] = time.perf_counter() - start
 
-# Handle missing values
-data['Siblings/Spouses Aboard'] = data['Siblings/Spouses Aboard'].fillna(data['Siblings/Spouses Aboard'].median())
-data['Parents/Children Aboard'] = data['Parents/Children Aboard'].fillna(data['Parents/Children Aboard'].median())
-data['Fare'] = data['Fare'].fillna(data['Fare'].median())
-data['Age'] = data['Age'].fillna(data['Age'].median())  # Handle missing age values
+    # Test accuracy
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    timings["predict_s"] = time.perf_counter() - start
+    accuracy = accuracy_score(y_test, y_pred)
+    print("Accuracy:", accuracy)
 
-# Define features and target
-features = ['Pclass', 'Sex', 'Age', 'Siblings/Spouses Aboard', 'Parents/Children Aboard', 'Fare']
-X = data[features]
-y = data['Survived']
+    # The app predicts one row at a time; a single-threaded forest avoids the thread pool overhead
+    model.set_params(n_jobs=None)
 
-# Split dataset
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Save model
+    start = time.perf_counter()
+    joblib.dump(model, args.model, compress=args.compress)
+    timings["save_s"] = time.perf_counter() - start
 
-# Train model
-model = RandomForestClassifier(random_state=42)
-model.fit(X_train, y_train)
+    manifest = {
+        "model_type": type(model).__name__,
+        "features": FEATURES,
+        "classes": [int(c) for c in model.classes_],
+        "fill_values": fill_values,
+        "params": {k: v for k, v in model.get_params().items() if isinstance(v, (bool, int, float, str, type(None)))},
+        "metrics": {"accuracy": accuracy, **(search_results or {})},
+        "timings": timings,
+        "training_data": {"path": os.path.basename(args.data), "sha256": data_hash, "rows": int(len(y))},
+        "artifact": {"path": os.path.basename(args.model), "sha256": file_sha256(args.model),
+                     "size": os.path.getsize(args.model), "compress": args.compress},
+        "sklearn_version": sklearn.__version__,
+        "created_at": time.time(),
+    }
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=lambda v: v.item() if isinstance(v, np.generic) else str(v))
+    print(f"Saved {args.model} ({manifest['artifact']['size'] / 1024:.0f} KB) and {args.manifest}")
+    print("Timings:", {k: round(v, 3) for k, v in timings.items()})
 
-# Save model
-joblib.dump(model, 'titanic_model.pkl')
 
-# Test accuracy
-y_pred = model.predict(X_test)
-print("Accuracy:", accuracy_score(y_test, y_pred))
+if __name__ == "__main__":
+    main()
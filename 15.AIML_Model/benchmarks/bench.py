@@ -0,0 +1,247 @@
+"""Benchmark harness for the train/predict/visualize paths of 15.AIML_Model.
+
+Runs fully offline on synthetic datasets shaped like titanic.csv, iris.csv
+and mushrooms.csv, times each operation and records its peak traced memory.
+Every run is appended to a JSON history and can be compared with a stored
+baseline.
+
+Examples:
+    python benchmarks/bench.py --sizes 1000 10000
+    python benchmarks/bench.py --shapes titanic --sizes 100000 --save-baseline
+    python benchmarks/bench.py --compare --threshold 0.2 --fail-on-regression
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+HISTORY_PATH = BENCH_DIR / "results" / "history.json"
+BASELINE_PATH = BENCH_DIR / "results" / "baseline.json"
+
+sys.path.insert(0, str(APP_DIR))
+
+import utils  # noqa: E402
+from dataset_profile import compute_profile  # noqa: E402
+from dataset_store import load_dataset, save_dataset  # noqa: E402
+from explain import compute_shap_values, explainer_kind  # noqa: E402
+
+# Quadratic-time models are skipped above this many rows
+MAX_ROWS = {"SVM": 20_000}
+
+
+def make_titanic(n, rng):
+    """Binary target with titanic-like numeric features."""
+    df = pd.DataFrame({
+        "Pclass": rng.integers(1, 4, n),
+        "Sex": rng.integers(0, 2, n),
+        "Age": rng.normal(30, 14, n).clip(0, 80).round(),
+        "SibSp": rng.poisson(0.5, n),
+        "Parch": rng.poisson(0.4, n),
+        "Fare": rng.lognormal(2.9, 1.0, n).round(2),
+    })
+    logit = 1.5 * df["Sex"] - 0.8 * (df["Pclass"] - 2) - 0.02 * (df["Age"] - 30)
+    df["Survived"] = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df, "Survived"
+
+
+def make_iris(n, rng):
+    """Three classes with four continuous features."""
+    species = rng.integers(0, 3, n)
+    centers = np.array([[5.0, 3.4, 1.5, 0.2], [5.9, 2.8, 4.3, 1.3], [6.6, 3.0, 5.6, 2.0]])
+    X = centers[species] + rng.normal(0, 0.3, (n, 4))
+    df = pd.DataFrame(X.round(1), columns=["sepal_length", "sepal_width", "petal_length", "petal_width"])
+    df["species"] = species
+    return df, "species"
+
+
+def make_mushrooms(n, rng):
+    """Binary target with 22 label-encoded categorical features."""
+    cardinalities = [6, 4, 10, 2, 9, 2, 2, 2, 12, 2, 5, 4, 4, 9, 9, 1, 4, 3, 5, 9, 6, 7]
+    df = pd.DataFrame({f"f{i}": rng.integers(0, k, n).astype(np.int8) for i, k in enumerate(cardinalities)})
+    df["type"] = ((df["f4"] % 3 == 0) ^ (rng.random(n) < 0.05)).astype(int)
+    return df, "type"
+
+
+SHAPES = {"titanic": make_titanic, "iris": make_iris, "mushrooms": make_mushrooms}
+
+
+def measure(fn, repeat):
+    """Run fn `repeat` times; return timing stats and the peak traced memory of the first run."""
+    times = []
+    peak = 0
+    for i in range(repeat):
+        if i == 0:
+            tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        if i == 0:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_mb": peak / 2 ** 20,
+        "repeat": repeat,
+    }
+
+
+def run_shape(shape, n, repeat, models, results):
+    rng = np.random.default_rng(0)
+    df, target = SHAPES[shape](n, rng)
+    features = [c for c in df.columns if c != target]
+    prefix = f"{shape}/{n}"
+
+    def record(name, fn, times=repeat):
+        key = f"{prefix}/{name}"
+        results[key] = measure(fn, times)
+        print(f"{key:<55} {results[key]['median_s'] * 1000:>10.2f} ms {results[key]['peak_mb']:>9.1f} MB",
+              flush=True)
+
+    # Dataset loading: CSV parse versus the columnar copy
+    csv_path = Path("datasets") / f"{shape}_{n}.csv"
+    save_dataset(df, csv_path.name)
+    record("csv_load", lambda: pd.read_csv(csv_path))
+    record("columnar_load", lambda: load_dataset(csv_path))
+
+    # Visualization computations
+    record("correlation", lambda: df.corr())
+    record("profile_ttests", lambda: compute_profile(df, features, target))
+
+    for model_name in models:
+        if n > MAX_ROWS.get(model_name, float("inf")):
+            continue
+        slug = model_name.replace(" ", "_").lower()
+        paths = []
+        record(f"train/{slug}", lambda: paths.append(
+            utils.train_and_save_model(df, target, model_name, n_jobs=-1)[1]), times=1)
+        model_path = paths[-1]
+
+        def cold_load():
+            utils.invalidate_model_cache()
+            utils.load_model(model_path)
+
+        record(f"load_model_cold/{slug}", cold_load)
+        record(f"load_model_warm/{slug}", lambda: utils.load_model(model_path))
+        model = utils.load_model(model_path)
+        record(f"predict/{slug}", lambda: utils.predict(model, df[features]))
+        record(f"get_model_info/{slug}", lambda: utils.get_model_info(model_path))
+
+        # Kernel SHAP (SVM) is orders of magnitude slower, so it explains fewer rows
+        sample_size, background_size = (10, 5) if explainer_kind(model) == "kernel" else (200, 50)
+
+        def shap_uncached():
+            compute_shap_values(model, df[features], model_key=str(time.perf_counter_ns()),
+                                dataset_key=prefix, sample_size=sample_size,
+                                background_size=background_size)
+
+        record(f"shap/{slug}", shap_uncached, times=1)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_json(path, default):
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return default
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline_s, current_s, ratio) for benchmarks slower than baseline by > threshold."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or previous["median_s"] <= 0:
+            continue
+        ratio = current["median_s"] / previous["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append((name, previous["median_s"], current["median_s"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000],
+                        help="Row counts to generate (10^3 to 10^7)")
+    parser.add_argument("--models", nargs="+", default=list(utils.MODELS), choices=list(utils.MODELS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    results = {}
+    # Work in a scratch directory so models/ and datasets/ of the app are untouched
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for shape in args.shapes:
+                for n in args.sizes:
+                    run_shape(shape, n, args.repeat, args.models, results)
+        finally:
+            os.chdir(cwd)
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    history = _load_json(HISTORY_PATH, [])
+    history.append(run)
+    _write_json(HISTORY_PATH, history)
+    print(f"\nAppended run to {HISTORY_PATH}")
+
+    if args.save_baseline:
+        _write_json(BASELINE_PATH, run)
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    if args.compare:
+        baseline = _load_json(BASELINE_PATH, None)
+        if baseline is None:
+            print("No baseline stored; run with --save-baseline first.")
+            return 0
+        regressions = compare(results, baseline, args.threshold)
+        if not regressions:
+            print(f"No regressions against baseline {baseline.get('commit')} ({baseline['timestamp']}).")
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from dataset_store import get_dataset_info, load_dataset, sidecar_path
+
+# Bump when the profile layout changes so stale profiles are recomputed
+PROFILE_VERSION = 1
+
+# Categorical features keep only their most frequent values
+MAX_CATEGORIES = 50
+
+
+def _numeric_summaries(df, numeric, codes, n_classes, bins):
+    """
+    Histogram counts per (feature, class) and per-class moments, one feature at a time.
+
+    Each feature is binned with a single bincount over its own values, so peak
+    memory is a few arrays of one column rather than rows x features matrices.
+
+    Returns:
+        tuple: edges (n_numeric, bins + 1), counts (n_numeric, n_classes, bins)
+        and {"count", "mean", "var"} moments of shape (n_classes, n_numeric)
+    """
+    edges = np.empty((len(numeric), bins + 1))
+    counts = np.zeros((len(numeric), n_classes, bins), dtype=np.int64)
+    moments = {name: np.empty((n_classes, len(numeric))) for name in ("count", "mean", "var")}
+    labelled = codes >= 0
+
+    for j, column in enumerate(numeric):
+        x = df[column].to_numpy(dtype=float)
+        lo, hi = np.nanmin(x), np.nanmax(x)
+        width = (hi - lo) / bins if hi > lo else 1.0
+        edges[j] = lo + width * np.arange(bins + 1)
+
+        valid = labelled & ~np.isnan(x)
+        x, c = x[valid], codes[valid]
+        idx = np.clip(np.floor((x - lo) / width).astype(np.int64), 0, bins - 1)
+        counts[j] = np.bincount(c * bins + idx, minlength=n_classes * bins).reshape(n_classes, bins)
+
+        # Sample variance (ddof=1) from a second pass, as pandas computes it
+        count = np.bincount(c, minlength=n_classes)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.bincount(c, weights=x, minlength=n_classes) / count
+            squares = np.bincount(c, weights=(x - mean[c]) ** 2, minlength=n_classes)
+            var = np.where(count > 1, squares / (count - 1), np.nan)
+        moments["count"][:, j], moments["mean"][:, j], moments["var"][:, j] = count, mean, var
+
+    return edges, counts, moments
+
+
+def _category_counts(values, codes, n_classes):
+    """Counts per (value, class) of the MAX_CATEGORIES most frequent values, sorted like pd.crosstab."""
+    value_codes, uniques = pd.factorize(values, sort=True)
+    present = value_codes >= 0
+    totals = np.bincount(value_codes[present], minlength=len(uniques))
+    top = pd.Series(totals).nlargest(MAX_CATEGORIES).index.to_numpy()
+
+    valid = present & (codes >= 0)
+    table = np.bincount(value_codes[valid] * n_classes + codes[valid],
+                        minlength=len(uniques) * n_classes).reshape(len(uniques), n_classes)
+    return [str(v) for v in uniques[top]], table[top].T
+
+
+def _ttests(count, mean, var):
+    """Two-sample pooled-variance t-tests between the first two classes (as stats.ttest_ind)."""
+    n0, n1 = count[0], count[1]
+    dof = n0 + n1 - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled = ((n0 - 1) * var[0] + (n1 - 1) * var[1]) / dof
+        t_stat = (mean[0] - mean[1]) / np.sqrt(pooled * (1 / n0 + 1 / n1))
+    p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+    return t_stat, p_value
+
+
+def compute_profile(df, feature_names, target_column, bins=30):
+    """
+    Compute histograms, per-class moments, t-tests, correlation and missingness.
+
+    Args:
+        df: DataFrame containing the features and target
+        feature_names: Features to profile
+        target_column: Name of the target column
+        bins: Number of histogram bins for numeric features
+
+    Returns:
+        dict: Dataset profile
+    """
+    codes, classes = pd.factorize(df[target_column], sort=True)
+    n_classes = len(classes)
+    numeric = [c for c in feature_names if pd.api.types.is_numeric_dtype(df[c])]
+    categorical = [c for c in feature_names if c not in numeric]
+
+    profile = {
+        "version": PROFILE_VERSION,
+        "rows": len(df),
+        "classes": [str(c) for c in classes],
+        "numeric_features": numeric,
+        "missing": df[feature_names + [target_column]].isnull().sum(),
+    }
+
+    profile["edges"], profile["counts"], moments = _numeric_summaries(df, numeric, codes, n_classes, bins)
+    profile["moments"] = moments
+
+    profile["ttest"] = None
+    if n_classes == 2 and numeric:
+        t_stat, p_value = _ttests(moments["count"], moments["mean"], moments["var"])
+        profile["ttest"] = pd.DataFrame({"t_statistic": t_stat, "p_value": p_value}, index=numeric)
+
+    corr_columns = numeric + ([target_column] if pd.api.types.is_numeric_dtype(df[target_column]) else [])
+    profile["corr"] = df[corr_columns].corr()
+
+    profile["categorical"] = {}
+    for column in categorical:
+        values, counts = _category_counts(df[column], codes, n_classes)
+        profile["categorical"][column] = {"values": values, "counts": counts}
+
+    return profile
+
+
+def get_dataset_profile(csv_path, feature_names, target_column, bins=30):
+    """
+    Return the dataset profile, computing and storing it on first use.
+
+    Profiles are stored next to the dataset's columnar copy and keyed by its
+    content hash, so they are recomputed only when the data changes.
+
+    Args:
+        csv_path: Path to the dataset CSV file
+        feature_names: Features to profile
+        target_column: Name of the target column
+        bins: Number of histogram bins for numeric features
+
+    Returns:
+        dict: Dataset profile (see compute_profile)
+    """
+    content_hash = get_dataset_info(csv_path)["content_hash"]
+    key = hashlib.sha256(json.dumps(
+        [PROFILE_VERSION, content_hash, list(feature_names), target_column, bins]
+    ).encode()).hexdigest()[:16]
+    profile_path = sidecar_path(csv_path, f".profile.{key}.joblib")
+    if profile_path.exists():
+        return joblib.load(profile_path)
+
+    df = load_dataset(csv_path, columns=list(feature_names) + [target_column])
+    profile = compute_profile(df, list(feature_names), target_column, bins)
+
+    tmp_path = profile_path.with_suffix(".tmp")
+    joblib.dump(profile, tmp_path, compress=3)
+    os.replace(tmp_path, profile_path)
+    return profile
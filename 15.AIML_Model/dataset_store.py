@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+DATASETS_DIR = Path("datasets")
+
+# Columnar copies and their metadata live in a hidden directory so that the
+# CSV listings used throughout the pages are unaffected.
+STORE_DIRNAME = ".store"
+
+
+def _store_dir(datasets_dir):
+    store_dir = Path(datasets_dir) / STORE_DIRNAME
+    store_dir.mkdir(parents=True, exist_ok=True)
+    return store_dir
+
+
+def sidecar_path(csv_path, suffix):
+    """Return the path of a file stored alongside a dataset's columnar copy."""
+    csv_path = Path(csv_path)
+    return _store_dir(csv_path.parent) / f"{csv_path.stem}{suffix}"
+
+
+def _parquet_path(csv_path):
+    return sidecar_path(csv_path, ".parquet")
+
+
+def _meta_path(csv_path):
+    return sidecar_path(csv_path, ".json")
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_meta(csv_path):
+    meta_path = _meta_path(csv_path)
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(meta, csv_path):
+    if meta is None or not _parquet_path(csv_path).exists():
+        return False
+    stat = Path(csv_path).stat()
+    return meta.get("source_mtime_ns") == stat.st_mtime_ns and meta.get("source_size") == stat.st_size
+
+
+def _describe(csv_path, df):
+    """Return the metadata of a CSV file loaded as df."""
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    return {
+        "name": csv_path.name,
+        "shape": [int(df.shape[0]), int(df.shape[1])],
+        "columns": df.columns.tolist(),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "null_counts": {col: int(n) for col, n in df.isnull().sum().items()},
+        "content_hash": file_hash(csv_path),
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+    }
+
+
+def _convert(csv_path, df=None):
+    """Write the columnar copy and metadata for a CSV file."""
+    csv_path = Path(csv_path)
+    if df is None:
+        df = pd.read_csv(csv_path)
+
+    parquet_path = _parquet_path(csv_path)
+    tmp_path = parquet_path.with_suffix(".parquet.tmp")
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, parquet_path)
+
+    meta = {**_describe(csv_path, df), "parquet": parquet_path.name}
+    meta_path = _meta_path(csv_path)
+    tmp_path = meta_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+    return meta
+
+
+def get_dataset_info(csv_path):
+    """
+    Return the cached metadata of a dataset, converting it on first use.
+
+    Args:
+        csv_path: Path to the dataset CSV file
+
+    Returns:
+        dict: name, shape, columns, dtypes, null_counts and content_hash
+    """
+    meta = _read_meta(csv_path)
+    if not _is_fresh(meta, csv_path):
+        meta = _convert(csv_path)
+    return meta
+
+
+def list_datasets(datasets_dir=DATASETS_DIR):
+    """
+    Return metadata for every CSV dataset without parsing the CSVs again.
+
+    A dataset whose columnar copy cannot be written (e.g. a column type Parquet
+    cannot store) is described from its CSV instead, and one that cannot be
+    read at all is left out, so a single bad file never breaks the listing.
+    """
+    datasets_dir = Path(datasets_dir)
+    if not datasets_dir.exists():
+        return []
+    datasets = []
+    for csv_path in sorted(datasets_dir.glob("*.csv")):
+        try:
+            datasets.append(get_dataset_info(csv_path))
+        except Exception:
+            try:
+                datasets.append(_describe(csv_path, pd.read_csv(csv_path)))
+            except Exception:
+                continue
+    return datasets
+
+
+def load_dataset(csv_path, columns=None):
+    """
+    Load a dataset from its columnar copy.
+
+    Args:
+        csv_path: Path to the dataset CSV file
+        columns: Optional list of columns to read; other columns are never touched
+
+    Returns:
+        DataFrame: The requested columns of the dataset
+    """
+    get_dataset_info(csv_path)
+    return pd.read_parquet(_parquet_path(csv_path), columns=columns, memory_map=True)
+
+
+def iter_dataset(csv_path, columns=None, chunk_size=100_000):
+    """Yield a dataset as DataFrames of at most chunk_size rows."""
+    get_dataset_info(csv_path)
+    parquet_file = pq.ParquetFile(_parquet_path(csv_path), memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def save_dataset(df, filename, datasets_dir=DATASETS_DIR):
+    """Save a DataFrame as a CSV dataset together with its columnar copy."""
+    datasets_dir = Path(datasets_dir)
+    datasets_dir.mkdir(exist_ok=True)
+    filepath = datasets_dir / filename
+    df.to_csv(filepath, index=False)
+    return _convert(filepath, df)
+
+
+def delete_dataset(csv_path):
+    """Remove a dataset CSV and every file stored alongside it."""
+    csv_path = Path(csv_path)
+    # Match sidecar names exactly: a prefix glob would also hit e.g. "iris.v2.parquet"
+    profile_name = re.compile(rf"{re.escape(csv_path.stem)}\.profile\.[0-9a-f]{{16}}\.joblib")
+    profiles = [path for path in _store_dir(csv_path.parent).iterdir() if profile_name.fullmatch(path.name)]
+    for path in [_parquet_path(csv_path), _meta_path(csv_path), *profiles, csv_path]:
+        if path.exists():
+            os.remove(path)
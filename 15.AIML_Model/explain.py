@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import joblib
+import numpy as np
+import shap
+from joblib import Parallel, delayed
+
+from dataset_store import file_hash
+from model_store import is_legacy, read_manifest
+
+# Persisted SHAP results, one file per (model hash, dataset hash, sample params)
+SHAP_CACHE_DIR = Path(os.environ.get("SHAP_CACHE_DIR", "models/.shap"))
+
+TREE_MODELS = ("RandomForestClassifier", "XGBClassifier")
+LINEAR_MODELS = ("LogisticRegression",)
+
+_model_hashes = {}
+
+
+def model_hash(model_path):
+    """Return the content hash of a model payload, memoized on path, mtime and size."""
+    if not is_legacy(model_path):
+        return read_manifest(model_path)["payload_sha256"]
+    path = Path(model_path).resolve()
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _model_hashes:
+        _model_hashes[key] = file_hash(path)
+    return _model_hashes[key]
+
+
+def explainer_kind(model):
+    """Pick the fastest exact SHAP explainer available for a model."""
+    name = type(model).__name__
+    if name in TREE_MODELS:
+        return "tree"
+    if name in LINEAR_MODELS:
+        return "linear"
+    return "kernel"
+
+
+def _build_explainer(model, background, kind):
+    if kind == "tree":
+        # Path-dependent Tree SHAP needs no background data
+        return shap.TreeExplainer(model)
+    if kind == "linear":
+        return shap.LinearExplainer(model, background)
+    predict_fn = model.predict_proba if hasattr(model, "predict_proba") else model.decision_function
+    return shap.KernelExplainer(predict_fn, background)
+
+
+def _explain_chunk(model, background, kind, chunk):
+    explainer = _build_explainer(model, background, kind)
+    if kind == "kernel":
+        return explainer.shap_values(chunk, silent=True)
+    return explainer.shap_values(chunk)
+
+
+def _normalize(values):
+    """Return SHAP values as (rows, features) or (rows, features, classes)."""
+    if isinstance(values, list):
+        values = np.stack(values, axis=-1)
+    values = np.asarray(values)
+    # For binary classifiers only the positive class is of interest
+    if values.ndim == 3 and values.shape[-1] == 2:
+        values = values[..., 1]
+    return values
+
+
+def compute_shap_values(model, X, model_key, dataset_key, sample_size=500,
+                        background_size=100, n_jobs=-1, random_state=0):
+    """
+    Compute SHAP values on a bounded sample of X, with results persisted on disk.
+
+    Args:
+        model: Trained model
+        X: Feature DataFrame
+        model_key: Hash identifying the model (see model_hash)
+        dataset_key: Hash identifying the dataset content
+        sample_size: Number of rows to explain
+        background_size: Number of rows used as background data
+        n_jobs: Parallel workers over explanation chunks
+        random_state: Seed for the row samples
+
+    Returns:
+        tuple: (shap_values, X_sample, explainer_kind)
+    """
+    kind = explainer_kind(model)
+    cache_key = hashlib.sha256(json.dumps(
+        [model_key, dataset_key, list(X.columns), kind, sample_size, background_size, random_state]
+    ).encode()).hexdigest()
+    cache_path = SHAP_CACHE_DIR / f"{cache_key}.joblib"
+    if cache_path.exists():
+        cached = joblib.load(cache_path)
+        return cached["values"], cached["X"], cached["kind"]
+
+    X_sample = X.sample(n=min(sample_size, len(X)), random_state=random_state)
+    background = X.sample(n=min(background_size, len(X)), random_state=random_state + 1)
+
+    n_workers = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+    chunks = [c for c in np.array_split(X_sample, min(n_workers, len(X_sample))) if len(c)]
+    results = Parallel(n_jobs=len(chunks))(
+        delayed(_explain_chunk)(model, background, kind, chunk) for chunk in chunks
+    )
+    values = np.concatenate([_normalize(r) for r in results], axis=0)
+
+    SHAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Unique name: concurrent sessions may explain the same model at once
+    tmp_path = cache_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    joblib.dump({"values": values, "X": X_sample, "kind": kind}, tmp_path, compress=3)
+    os.replace(tmp_path, cache_path)
+    return values, X_sample, kind
+
+
+def summary_plot(values, X_sample, plot_type=None):
+    """Draw a SHAP summary plot for 2D (binary/regression) or 3D (multi-class) values."""
+    if values.ndim == 3:
+        values = [values[..., i] for i in range(values.shape[-1])]
+        plot_type = "bar"
+    shap.summary_plot(values, X_sample, plot_type=plot_type, show=False)
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from pathlib import Path
+
+from sklearn.metrics import classification_report, confusion_matrix
+
+from dataset_store import get_dataset_info, load_dataset
+from utils import train_and_save_model
+
+# The job table lives next to the models so it survives container restarts
+# when models/ is mounted as a volume.
+JOBS_DB = Path(os.environ.get("JOBS_DB", "models/jobs.db"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    dedup_key TEXT UNIQUE NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    stage TEXT,
+    dataset TEXT NOT NULL,
+    dataset_hash TEXT NOT NULL,
+    target_column TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    params TEXT NOT NULL,
+    test_size REAL NOT NULL,
+    random_state INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+_executor = None
+_executor_lock = threading.Lock()
+# Unfinished jobs of a previous process are re-queued once, when the first pool is created
+_recovered = False
+
+
+def _connect(db_path=None):
+    db_path = Path(db_path or JOBS_DB)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _update(job_id, **fields):
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with closing(_connect()) as conn, conn:  # one transaction
+        conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _row_to_job(row):
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _run_job(job_id):
+    """Execute one training job inside a worker process."""
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    job = _row_to_job(row)
+
+    _update(job_id, status=RUNNING, progress=0.1, stage="loading data", started_at=time.time())
+    try:
+        df = load_dataset(job["dataset"])
+
+        _update(job_id, progress=0.3, stage="training")
+        accuracy, model_path, y_test, y_pred, feature_importance = train_and_save_model(
+            df, job["target_column"], job["model_name"],
+            test_size=job["test_size"],
+            random_state=job["random_state"],
+            params=job["params"]
+        )
+
+        _update(job_id, progress=0.9, stage="evaluating")
+        labels = sorted(set(y_test) | set(y_pred), key=str)
+        result = {
+            "accuracy": float(accuracy),
+            "model_path": model_path,
+            "labels": [str(label) for label in labels],
+            "confusion_matrix": confusion_matrix(y_test, y_pred, labels=labels).tolist(),
+            "classification_report": classification_report(y_test, y_pred),
+            "feature_names": [c for c in df.columns if c != job["target_column"]],
+            "feature_importance": None if feature_importance is None else [float(v) for v in feature_importance],
+        }
+        _update(job_id, status=DONE, progress=1.0, stage=None, result=json.dumps(result),
+                finished_at=time.time())
+    except Exception as e:
+        _update(job_id, status=FAILED, stage=None, error=str(e), finished_at=time.time())
+
+
+def _get_executor():
+    """Return the process-wide worker pool, re-queueing unfinished jobs when the first one is created.
+
+    Called by list_jobs as well as submit_training_job, so jobs interrupted by a
+    restart resume as soon as the jobs page is opened, not at the next submit.
+    """
+    global _executor, _recovered
+    pending = []
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS)
+        executor = _executor
+        if not _recovered:
+            _recovered = True
+            # Jobs left queued or running by a previous process never finished
+            with closing(_connect()) as conn, conn:  # one transaction
+                pending = [row["id"] for row in conn.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING))]
+                conn.execute("UPDATE jobs SET status = ?, progress = 0, stage = NULL WHERE status = ?",
+                             (QUEUED, RUNNING))
+    for job_id in pending:
+        _submit(job_id)
+    return executor
+
+
+def _discard_executor(executor):
+    """Forget a broken pool so that the next submit creates a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _submit(job_id):
+    """Run a job on the worker pool, replacing the pool if a dead worker broke it."""
+    executor = _get_executor()
+    try:
+        future = executor.submit(_run_job, job_id)
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        executor = _get_executor()
+        future = executor.submit(_run_job, job_id)
+    future.add_done_callback(lambda future: _on_job_done(job_id, executor, future))
+
+
+def _on_job_done(job_id, executor, future):
+    """Record failures that happen outside _run_job, e.g. a worker killed by the OOM killer."""
+    if future.cancelled() or future.exception() is None:
+        return
+    error = future.exception()
+    if isinstance(error, BrokenProcessPool):
+        _discard_executor(executor)
+        job = get_job(job_id)
+        if job is not None and job["status"] == QUEUED:
+            # The job never started: it was only queued on the pool that broke
+            _submit(job_id)
+            return
+    _update(job_id, status=FAILED, stage=None, error=f"Worker failed: {error!r}", finished_at=time.time())
+
+
+def submit_training_job(dataset_path, target_column, model_name, params=None,
+                        test_size=0.2, random_state=42):
+    """
+    Queue a train_and_save_model job and return its id.
+
+    Submitting the same dataset content, target, model and parameters again
+    returns the existing job instead of training a second time; only failed
+    jobs are retried.
+
+    Args:
+        dataset_path: Path to the dataset CSV file
+        target_column: Name of the target column
+        model_name: Name of the model to train
+        params: Hyperparameters passed to the model constructor
+        test_size: Proportion of data to use for testing
+        random_state: Random seed for reproducibility
+
+    Returns:
+        str: Job id
+    """
+    params = params or {}
+    dataset_hash = get_dataset_info(dataset_path)["content_hash"]
+    dedup_key = hashlib.sha256(json.dumps(
+        [dataset_hash, target_column, model_name, params, test_size, random_state],
+        sort_keys=True, default=str).encode()).hexdigest()
+
+    _get_executor()  # re-queues a previous process's jobs before this one is added
+    with closing(_connect()) as conn, conn:  # one transaction
+        row = conn.execute("SELECT id, status FROM jobs WHERE dedup_key = ?", (dedup_key,)).fetchone()
+        if row is not None and row["status"] != FAILED:
+            return row["id"]
+
+        if row is not None:
+            job_id = row["id"]
+            conn.execute("UPDATE jobs SET status = ?, progress = 0, error = NULL, result = NULL, "
+                         "created_at = ?, started_at = NULL, finished_at = NULL WHERE id = ?",
+                         (QUEUED, time.time(), job_id))
+        else:
+            job_id = uuid.uuid4().hex[:12]
+            conn.execute(
+                "INSERT INTO jobs (id, dedup_key, status, dataset, dataset_hash, target_column, "
+                "model_name, params, test_size, random_state, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, dedup_key, QUEUED, str(dataset_path), dataset_hash, target_column,
+                 model_name, json.dumps(params, default=str), test_size, random_state, time.time()))
+
+    _submit(job_id)
+    return job_id
+
+
+def get_job(job_id):
+    """Return a job as a dict, or None if it does not exist."""
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row is not None else None
+
+
+def list_jobs(limit=50):
+    """Return the most recent jobs, newest first."""
+    _get_executor()
+    with closing(_connect()) as conn:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    return [_row_to_job(row) for row in rows]
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+MODELS_DIR = Path("models")
+
+# Artifact layout:
+#   models/<name>/v0001/manifest.json   small JSON with everything but the estimator
+#   models/<name>/v0001/model.joblib    the estimator itself
+#   models/<name>/LATEST                name of the newest version directory
+# Versions are never rewritten; saving again creates the next version.
+MANIFEST_NAME = "manifest.json"
+PAYLOAD_NAME = "model.joblib"
+LATEST_NAME = "LATEST"
+FORMAT_VERSION = 1
+
+# zlib level for the estimator payload; 0 stores it uncompressed so that its
+# numpy arrays can be memory-mapped on load
+MODEL_COMPRESS = int(os.environ.get("MODEL_COMPRESS", 3))
+
+_VERSION_RE = re.compile(r"^v(\d+)$")
+
+
+def _json_safe(value):
+    """Convert numpy values (and anything else non-JSON) into JSON-friendly types."""
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _json_safe(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+def _write_json(path, data):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _new_version_dir(artifact_dir):
+    """Create and return the next free version directory."""
+    versions = [int(m.group(1)) for m in map(_VERSION_RE.match, os.listdir(artifact_dir)) if m]
+    version = max(versions, default=0) + 1
+    while True:
+        version_dir = artifact_dir / f"v{version:04d}"
+        try:
+            version_dir.mkdir()
+            return version, version_dir
+        except FileExistsError:
+            version += 1
+
+
+def is_legacy(model_path):
+    """Return True for single-file joblib pickles saved before the artifact layout."""
+    return Path(model_path).suffix == ".pkl"
+
+
+def resolve_version_dir(model_path):
+    """Resolve an artifact directory (via its LATEST pointer) or a version directory."""
+    path = Path(model_path)
+    latest = path / LATEST_NAME
+    if latest.exists():
+        return path / latest.read_text(encoding="utf-8").strip()
+    return path
+
+
+def payload_path(model_path):
+    """Return the file holding the estimator for a model path."""
+    if is_legacy(model_path):
+        return Path(model_path)
+    return resolve_version_dir(model_path) / PAYLOAD_NAME
+
+
+def read_manifest(model_path):
+    """Read a model's manifest without touching the estimator payload."""
+    version_dir = resolve_version_dir(model_path)
+    with open(version_dir / MANIFEST_NAME, encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["path"] = str(version_dir)
+    return manifest
+
+
+def write_artifact(model, name, feature_names, target_column, metrics=None, timings=None,
+                   training_data_hash=None, models_dir=MODELS_DIR, compress=MODEL_COMPRESS):
+    """
+    Save a model as a new immutable version and point LATEST at it.
+
+    Args:
+        model: Trained model
+        name: Artifact name, e.g. Random_Forest_42
+        feature_names: Features the model was trained on, in training order
+        target_column: Name of the target column
+        metrics: Evaluation metrics, e.g. {"accuracy": 0.81}
+        timings: Timings in seconds, e.g. {"fit_s": 1.2, "predict_s": 0.01}
+        training_data_hash: Hash of the training DataFrame
+        models_dir: Root directory of all artifacts
+        compress: zlib level for the payload (0 keeps it memory-mappable)
+
+    Returns:
+        Path: The new version directory
+    """
+    artifact_dir = Path(models_dir) / name
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    version, version_dir = _new_version_dir(artifact_dir)
+
+    start = time.perf_counter()
+    payload = version_dir / PAYLOAD_NAME
+    joblib.dump(model, payload, compress=compress)
+    timings = dict(timings or {}, save_s=time.perf_counter() - start)
+
+    feature_importance = None
+    if hasattr(model, 'feature_importances_'):
+        feature_importance = model.feature_importances_
+    elif hasattr(model, 'coef_'):
+        feature_importance = np.abs(model.coef_[0])
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "name": name,
+        "version": version,
+        "type": type(model).__name__,
+        "feature_names": list(feature_names),
+        "target_column": target_column,
+        "params": model.get_params(),
+        "feature_importance": feature_importance,
+        "metrics": metrics or {},
+        "timings": timings,
+        "training_data_hash": training_data_hash,
+        "payload": PAYLOAD_NAME,
+        "payload_size": payload.stat().st_size,
+        "payload_sha256": _file_sha256(payload),
+        "compressed": bool(compress),
+        "created_at": time.time(),
+    }
+    _write_json(version_dir / MANIFEST_NAME, _json_safe(manifest))
+
+    # Move the pointer last so readers never see a half-written version
+    latest_tmp = artifact_dir / f"{LATEST_NAME}.tmp"
+    latest_tmp.write_text(version_dir.name, encoding="utf-8")
+    os.replace(latest_tmp, artifact_dir / LATEST_NAME)
+    return version_dir
+
+
+def load_artifact(model_path):
+    """Load a model dictionary (model, feature_names, target_column) from disk."""
+    if is_legacy(model_path):
+        return joblib.load(model_path)
+
+    manifest = read_manifest(model_path)
+    payload = Path(manifest["path"]) / manifest["payload"]
+    model = joblib.load(payload, mmap_mode=None if manifest["compressed"] else "r")
+    return {
+        'model': model,
+        'feature_names': manifest["feature_names"],
+        'target_column': manifest["target_column"],
+        'manifest': manifest
+    }
+
+
+def list_artifacts(models_dir=MODELS_DIR, all_versions=False):
+    """
+    List saved models from their manifests (and legacy .pkl files) without loading them.
+
+    Args:
+        models_dir: Root directory of all artifacts
+        all_versions: List every version instead of only the latest one
+
+    Returns:
+        list: Manifest dicts with a "path" key; legacy files only have name, path and legacy
+    """
+    models_dir = Path(models_dir)
+    if not models_dir.exists():
+        return []
+
+    artifacts = []
+    for artifact_dir in sorted(p for p in models_dir.iterdir() if (p / LATEST_NAME).exists()):
+        if all_versions:
+            version_dirs = sorted(p for p in artifact_dir.iterdir()
+                                  if _VERSION_RE.match(p.name) and (p / MANIFEST_NAME).exists())
+            artifacts.extend(read_manifest(p) for p in reversed(version_dirs))
+        else:
+            artifacts.append(read_manifest(artifact_dir))
+
+    for legacy_path in sorted(models_dir.glob("*.pkl")):
+        artifacts.append({"name": legacy_path.stem, "version": None, "path": str(legacy_path), "legacy": True})
+    return artifacts
+
+
+def artifact_label(artifact):
+    """Human readable name for a listed artifact."""
+    if artifact.get("legacy"):
+        return artifact["name"].replace("_", " ")
+    return f"{artifact['name'].replace('_', ' ')} (v{artifact['version']})"
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-import os
 from pathlib import Path
+from dataset_store import list_datasets, save_dataset, delete_dataset
 
 def show():
     # Initialize session state for refresh
@@ -14,8 +14,8 @@ def show():
     datasets_dir = Path("datasets")
     datasets_dir.mkdir(exist_ok=True)
 
-    # List existing datasets
-    existing_datasets = [f for f in datasets_dir.glob("*.csv")]
+    # List existing datasets (served from the cached metadata index)
+    existing_datasets = {info["name"]: info for info in list_datasets(datasets_dir)}
 
     # Sidebar for dataset selection
     with st.sidebar:
@@ -23,13 +23,13 @@ def show():
         if existing_datasets:
             selected_dataset = st.selectbox(
                 "Select a dataset",
-                options=[f.name for f in existing_datasets],
+                options=list(existing_datasets),
                 format_func=lambda x: x.replace(".csv", "")
             )
             if selected_dataset:
-                df = pd.read_csv(datasets_dir / selected_dataset)
-                st.write(f"Shape: {df.shape}")
-                st.write("Columns:", df.columns.tolist())
+                info = existing_datasets[selected_dataset]
+                st.write(f"Shape: {tuple(info['shape'])}")
+                st.write("Columns:", info["columns"])
         else:
             st.info("No datasets available. Upload a new dataset below.")
 
@@ -65,8 +65,7 @@ def show():
                     filename += ".csv"
 
                 # Save to datasets directory
-                filepath = datasets_dir / filename
-                df.to_csv(filepath, index=False)
+                save_dataset(df, filename, datasets_dir)
                 st.success(f"Dataset saved successfully as {filename}")
                 st.rerun()
 
@@ -85,8 +84,7 @@ def show():
             try:
                 df = pd.read_csv(url)
                 filename = f"{name.lower()}.csv"
-                filepath = datasets_dir / filename
-                df.to_csv(filepath, index=False)
+                save_dataset(df, filename, datasets_dir)
                 st.success(f"{name} dataset loaded and saved successfully!")
                 st.rerun()
             except Exception as e:
@@ -95,16 +93,16 @@ def show():
     # Dataset management section
     if existing_datasets:
         st.subheader("Dataset Management")
-        for dataset in existing_datasets:
+        for info in existing_datasets.values():
+            dataset = datasets_dir / info["name"]
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write(f"**{dataset.stem}**")
-                df = pd.read_csv(dataset)
-                st.write(f"Shape: {df.shape} | Columns: {len(df.columns)}")
+                st.write(f"Shape: {tuple(info['shape'])} | Columns: {info['shape'][1]}")
             with col2:
                 if st.button("Delete", key=f"delete_{dataset.stem}"):
                     try:
-                        os.remove(dataset)
+                        delete_dataset(dataset)
                         st.success(f"Deleted {dataset.name}")
                         st.rerun()
                     except Exception as e:
@@ -2,12 +2,127 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import os
-from utils import train_and_save_model
+from utils import train_and_save_model, run_sweep, DEFAULT_PARAM_GRID, MODELS
+from dataset_store import get_dataset_info, load_dataset
+from jobs import submit_training_job, list_jobs, get_job
+import numpy as np
 import plotly.express as px
 from sklearn.metrics import confusion_matrix, classification_report
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+def _parse_values(text):
+    """Parse a comma-separated list of hyperparameter values (int, float or str)."""
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        for cast in (int, float):
+            try:
+                values.append(cast(item))
+                break
+            except ValueError:
+                continue
+        else:
+            values.append(item)
+    return values
+
+def show_results(accuracy, model_path, cm, report, feature_columns, feature_importance):
+    """Display the metrics of a trained model."""
+    st.success(f"Model trained successfully! Accuracy: {accuracy:.2f}")
+    st.write(f"Model saved at: `{model_path}`")
+
+    # Display confusion matrix
+    st.subheader("Confusion Matrix")
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(cm, annot=True, fmt='d', ax=ax)
+    st.pyplot(fig)
+
+    # Display classification report
+    st.subheader("Classification Report")
+    st.text(report)
+
+    # Display feature importance if available
+    if feature_importance is not None:
+        st.subheader("Feature Importance")
+        importance_df = pd.DataFrame({
+            'Feature': feature_columns,
+            'Importance': feature_importance
+        }).sort_values('Importance', ascending=False)
+
+        fig = px.bar(importance_df, x='Importance', y='Feature', orientation='h')
+        st.plotly_chart(fig)
+
+def show_jobs():
+    """List background training jobs and display the results of a finished one."""
+    st.subheader("Training Jobs")
+    st.button("Refresh Jobs")
+
+    jobs = list_jobs()
+    if not jobs:
+        st.info("No training jobs yet.")
+        return
+
+    st.dataframe(pd.DataFrame([{
+        "Job": job["id"],
+        "Status": job["status"],
+        "Progress": f"{job['progress']:.0%}" + (f" ({job['stage']})" if job["stage"] else ""),
+        "Model": job["model_name"],
+        "Params": str(job["params"]),
+        "Dataset": Path(job["dataset"]).name,
+        "Accuracy": job["result"]["accuracy"] if job["result"] else None,
+    } for job in jobs]))
+
+    finished = [job["id"] for job in jobs if job["status"] in ("done", "failed")]
+    if not finished:
+        return
+    default = st.session_state.get("selected_job")
+    job_id = st.selectbox("Show job results", finished,
+                          index=finished.index(default) if default in finished else 0)
+    job = get_job(job_id)
+    if job["status"] == "failed":
+        st.error(f"Error during model training: {job['error']}")
+        return
+    result = job["result"]
+    show_results(result["accuracy"], result["model_path"], np.array(result["confusion_matrix"]),
+                 result["classification_report"], result["feature_names"], result["feature_importance"])
+
+def show_sweep(datasets_dir, selected_dataset, target_column, test_size, random_state):
+    """Hyperparameter sweep over several models, trained in parallel."""
+    st.subheader("Hyperparameter Sweep")
+    sweep_models = st.multiselect("Models to sweep", list(MODELS), default=["Random Forest"])
+
+    param_grids = {}
+    for model_name in sweep_models:
+        st.write(f"**{model_name}**")
+        grid = {}
+        for param, values in DEFAULT_PARAM_GRID[model_name].items():
+            text = st.text_input(f"{param} values", ", ".join(map(str, values)),
+                                 key=f"sweep_{model_name}_{param}")
+            grid[param] = _parse_values(text)
+        param_grids[model_name] = grid
+
+    col1, col2 = st.columns(2)
+    with col1:
+        cpu_count = os.cpu_count() or 1
+        max_workers = int(st.number_input("Worker processes", 1, cpu_count, min(4, cpu_count)))
+    with col2:
+        save = st.radio("Save models", ["best", "all", "none"], horizontal=True)
+
+    if st.button("Run Sweep") and param_grids:
+        try:
+            df = load_dataset(datasets_dir / selected_dataset)
+            with st.spinner("Running sweep..."):
+                leaderboard = run_sweep(df, target_column, param_grids,
+                                        test_size=test_size, random_state=random_state,
+                                        max_workers=max_workers, save=save)
+            st.success(f"Sweep finished: {len(leaderboard)} runs")
+            leaderboard["params"] = leaderboard["params"].astype(str)
+            st.dataframe(leaderboard)
+        except Exception as e:
+            st.error(f"Error during sweep: {str(e)}")
+
 def show():
     st.title("Train ML Models")
 
@@ -30,22 +145,23 @@ def show():
     )
 
     if selected_dataset:
-        # Load the selected dataset
-        df = pd.read_csv(datasets_dir / selected_dataset)
+        # Dataset metadata comes from the index; the data itself is only read when training
+        dataset_info = get_dataset_info(datasets_dir / selected_dataset)
+        columns = dataset_info["columns"]
 
         # Display dataset info
         col1, col2 = st.columns(2)
         with col1:
-            st.write("Dataset Shape:", df.shape)
+            st.write("Dataset Shape:", tuple(dataset_info["shape"]))
         with col2:
-            st.write("Number of Features:", len(df.columns))
+            st.write("Number of Features:", len(columns))
 
         # Feature selection
         st.subheader("Feature Selection")
-        target_column = st.selectbox("Select Target Column", df.columns)
+        target_column = st.selectbox("Select Target Column", columns)
 
         # Feature columns (excluding target)
-        feature_columns = [col for col in df.columns if col != target_column]
+        feature_columns = [col for col in columns if col != target_column]
 
         # Model selection
         st.subheader("Model Selection")
@@ -56,61 +172,63 @@ def show():
 
         # Model parameters
         st.subheader("Model Parameters")
+        params = {}
         if model_choice == "Random Forest":
-            n_estimators = st.slider("Number of Trees", 10, 200, 100)
-            max_depth = st.slider("Max Depth", 2, 20, 5)
+            params["n_estimators"] = st.slider("Number of Trees", 10, 200, 100)
+            params["max_depth"] = st.slider("Max Depth", 2, 20, 5)
         elif model_choice == "XGBoost":
-            n_estimators = st.slider("Number of Trees", 10, 200, 100)
-            learning_rate = st.slider("Learning Rate", 0.01, 0.3, 0.1)
+            params["n_estimators"] = st.slider("Number of Trees", 10, 200, 100)
+            params["learning_rate"] = st.slider("Learning Rate", 0.01, 0.3, 0.1)
         elif model_choice == "SVM":
-            kernel = st.selectbox("Kernel", ["rbf", "linear", "poly"])
-            C = st.slider("C (Regularization)", 0.1, 10.0, 1.0)
+            params["kernel"] = st.selectbox("Kernel", ["rbf", "linear", "poly"])
+            params["C"] = st.slider("C (Regularization)", 0.1, 10.0, 1.0)
 
         # Training options
         st.subheader("Training Options")
         test_size = st.slider("Test Set Size", 0.1, 0.4, 0.2, 0.05)
         random_state = st.number_input("Random State", 0, 1000, 42)
 
+        # Background jobs keep training out of the script thread, so widget
+        # interactions no longer restart a long fit
+        run_in_background = st.checkbox("Run in background", value=True)
+
         if st.button("Train Model"):
-            try:
-                # Create models directory if it doesn't exist
-                models_dir = Path("models")
-                models_dir.mkdir(exist_ok=True)
-
-                # Train model and get metrics
-                accuracy, model_path, y_test, y_pred, feature_importance = train_and_save_model(
-                    df, target_column, model_choice,
-                    test_size=test_size,
-                    random_state=random_state
-                )
-
-                # Display results
-                st.success(f"Model trained successfully! Accuracy: {accuracy:.2f}")
-                st.write(f"Model saved at: `{model_path}`")
-
-                # Display confusion matrix
-                st.subheader("Confusion Matrix")
-                cm = confusion_matrix(y_test, y_pred)
-                fig, ax = plt.subplots(figsize=(8, 6))
-                sns.heatmap(cm, annot=True, fmt='d', ax=ax)
-                st.pyplot(fig)
-
-                # Display classification report
-                st.subheader("Classification Report")
-                report = classification_report(y_test, y_pred)
-                st.text(report)
-
-                # Display feature importance if available
-                if feature_importance is not None:
-                    st.subheader("Feature Importance")
-                    importance_df = pd.DataFrame({
-                        'Feature': feature_columns,
-                        'Importance': feature_importance
-                    }).sort_values('Importance', ascending=False)
-
-                    fig = px.bar(importance_df, x='Importance', y='Feature', orientation='h')
-                    st.plotly_chart(fig)
-
-            except Exception as e:
-                st.error(f"Error during model training: {str(e)}")
-                st.error("Please check if your data is properly formatted and the target column contains valid values.")
+            if run_in_background:
+                try:
+                    job_id = submit_training_job(
+                        datasets_dir / selected_dataset, target_column, model_choice,
+                        params=params,
+                        test_size=test_size,
+                        random_state=random_state
+                    )
+                    st.session_state["selected_job"] = job_id
+                    st.info(f"Training job `{job_id}` submitted.")
+                except Exception as e:
+                    st.error(f"Error submitting training job: {str(e)}")
+            else:
+                try:
+                    # Create models directory if it doesn't exist
+                    models_dir = Path("models")
+                    models_dir.mkdir(exist_ok=True)
+
+                    df = load_dataset(datasets_dir / selected_dataset)
+
+                    # Train model and get metrics
+                    accuracy, model_path, y_test, y_pred, feature_importance = train_and_save_model(
+                        df, target_column, model_choice,
+                        test_size=test_size,
+                        random_state=random_state,
+                        params=params,
+                        n_jobs=-1
+                    )
+
+                    show_results(accuracy, model_path, confusion_matrix(y_test, y_pred),
+                                 classification_report(y_test, y_pred), feature_columns, feature_importance)
+
+                except Exception as e:
+                    st.error(f"Error during model training: {str(e)}")
+                    st.error("Please check if your data is properly formatted and the target column contains valid values.")
+
+        show_jobs()
+
+        show_sweep(datasets_dir, selected_dataset, target_column, test_size, random_state)
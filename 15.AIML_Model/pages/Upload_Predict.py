@@ -1,26 +1,76 @@
 import streamlit as st
 import pandas as pd
-from utils import load_model, predict
+from utils import load_model_data, list_models, predict, predict_in_chunks
+from model_store import artifact_label
+from dataset_store import get_dataset_info, iter_dataset, list_datasets, load_dataset
 import os
 from pathlib import Path
-import joblib
+import tempfile
+import gzip
+
+# Largest compressed predictions file offered as a download; st.download_button
+# holds the whole file in memory, so bigger outputs are only kept on disk
+MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024
+
+def _stream_predictions(model, feature_names, input_file, chunk_size):
+    """Score the input chunk by chunk into a temporary CSV and return its path."""
+    progress = st.progress(0.0)
+    status = st.empty()
+
+    total_rows = None
+    if isinstance(input_file, Path):
+        total_rows = get_dataset_info(input_file)["shape"][0]
+        chunks = iter_dataset(input_file, columns=feature_names, chunk_size=chunk_size)
+    else:
+        input_file.seek(0)
+        chunks = pd.read_csv(input_file, chunksize=chunk_size)
+
+    def on_progress(rows, elapsed):
+        if total_rows is not None:
+            fraction = rows / max(total_rows, 1)
+        else:
+            fraction = input_file.tell() / max(input_file.size, 1)
+        progress.progress(min(fraction, 1.0))
+        status.write(f"Scored {rows:,} rows ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    output = tempfile.NamedTemporaryFile(prefix="predictions_", suffix=".csv", delete=False)
+    output.close()
+    try:
+        rows, elapsed = predict_in_chunks(model, chunks, feature_names, output.name, on_progress)
+    except Exception:
+        os.remove(output.name)
+        raise
+    progress.progress(1.0)
+    status.write(f"Scored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return output.name
+
+def _compress_predictions(output_path, chunk_size):
+    """Write the Predictions column of a scored CSV to a gzipped CSV next to it and return its path."""
+    compressed_path = f"{os.path.splitext(output_path)[0]}.csv.gz"
+    chunks = pd.read_csv(output_path, usecols=["Predictions"], chunksize=chunk_size)
+    with open(compressed_path, "wb") as raw, gzip.open(raw, "wt", newline="", encoding="utf-8") as out:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(out, header=(i == 0), index=False)
+    return compressed_path
 
 def show():
     st.title("Upload Data & Predict")
 
     # Get available models
     models_dir = Path("models")
-    if not models_dir.exists() or not any(models_dir.glob("*.pkl")):
+    show_versions = st.checkbox("Show all model versions")
+    models = list_models(models_dir, all_versions=show_versions)
+    if not models:
         st.warning("No trained models found. Train a model first.")
         return
 
-    model_files = [f for f in models_dir.glob("*.pkl")]
-    selected_model = st.selectbox("Select a model", model_files)
+    model_labels = {m["path"]: artifact_label(m) for m in models}
+    selected_model = st.selectbox("Select a model", list(model_labels), format_func=model_labels.get)
 
     if selected_model:
         try:
             # Load model and get feature names
-            model_data = joblib.load(selected_model)
+            model_data = load_model_data(selected_model)
             model = model_data['model']
             feature_names = model_data['feature_names']
             target_column = model_data['target_column']
@@ -28,16 +78,85 @@ def show():
             st.write("Required Features:", feature_names)
             st.write("Target Column:", target_column)
 
-            # File uploader
-            uploaded_file = st.file_uploader("Upload CSV for Prediction", type=["csv"])
-
-            if uploaded_file:
+            # Data source: a new upload or one of the saved datasets
+            source = st.radio("Data Source", ["Upload CSV", "Saved Dataset"], horizontal=True)
+            input_file = None
+
+            if source == "Upload CSV":
+                # File uploader
+                input_file = st.file_uploader("Upload CSV for Prediction", type=["csv"])
+            else:
+                datasets_dir = Path("datasets")
+                compatible = [info["name"] for info in list_datasets(datasets_dir)
+                              if all(f in info["columns"] for f in feature_names)]
+                if compatible:
+                    selected_dataset = st.selectbox("Select a dataset", compatible)
+                    input_file = datasets_dir / selected_dataset
+                else:
+                    st.info("No saved dataset contains the required features.")
+
+            # Streaming mode scores the input in fixed-size chunks, so memory
+            # stays bounded by the chunk size instead of the file size
+            streaming = st.checkbox("Streaming mode (score in chunks)", value=True)
+            chunk_size = int(st.number_input("Chunk size (rows)", 1_000, 1_000_000, 100_000, step=10_000,
+                                             disabled=not streaming))
+
+            if input_file and streaming:
                 try:
-                    # Read the file
-                    df = pd.read_csv(uploaded_file)
+                    # Only rescore when the model, input or chunk size changed
+                    if isinstance(input_file, Path):
+                        input_id = (str(input_file), get_dataset_info(input_file)["content_hash"])
+                    else:
+                        input_id = input_file.file_id
+                    run_key = (str(selected_model), input_id, chunk_size)
+
+                    if st.session_state.get("stream_run_key") != run_key:
+                        for key in ("stream_output", "stream_download"):
+                            previous_output = st.session_state.pop(key, None)
+                            if previous_output and os.path.exists(previous_output):
+                                os.remove(previous_output)
+                        st.session_state["stream_output"] = _stream_predictions(
+                            model, feature_names, input_file, chunk_size
+                        )
+                        st.session_state["stream_download"] = _compress_predictions(
+                            st.session_state["stream_output"], chunk_size
+                        )
+                        st.session_state["stream_run_key"] = run_key
+
+                    output_path = st.session_state["stream_output"]
+                    download_path = st.session_state["stream_download"]
+
+                    # Display results
+                    st.write("Predictions Preview:")
+                    st.dataframe(pd.read_csv(output_path, nrows=20)[["Predictions"]])
+
+                    # Download button: predictions only, gzipped, as long as it fits the cap
+                    if os.path.getsize(download_path) <= MAX_DOWNLOAD_BYTES:
+                        with open(download_path, "rb") as download_f:
+                            st.download_button(
+                                "Download Predictions",
+                                download_f,
+                                "predictions.csv.gz",
+                                "application/gzip"
+                            )
+                    else:
+                        st.warning("Predictions are too large to download from the browser.")
+                    st.caption(f"Features and predictions are saved to `{output_path}`")
+
+                except Exception as e:
+                    st.error(f"Error processing file: {str(e)}")
+                    st.error("Please ensure your data matches the required format and features.")
 
-                    # Display uploaded data
-                    st.write("Uploaded Data Preview:")
+            elif input_file:
+                try:
+                    # Read the input; saved datasets only read the feature columns
+                    if isinstance(input_file, Path):
+                        df = load_dataset(input_file, columns=feature_names)
+                    else:
+                        df = pd.read_csv(input_file)
+
+                    # Display input data
+                    st.write("Input Data Preview:")
                     st.dataframe(df.head())
 
                     # Check if all required features are present
@@ -62,7 +181,7 @@ def show():
                     # Download button
                     st.download_button(
                         "Download Predictions",
-                        df.to_csv(index=False).encode('utf-8'),
+                        df[["Predictions"]].to_csv(index=False).encode('utf-8'),
                         "predictions.csv",
                         "text/csv"
                     )
@@ -1,17 +1,34 @@
 import streamlit as st
 import pandas as pd
-import shap
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
-from utils import load_model, get_model_info
+from utils import load_model_data, get_model_info, list_models
+from model_store import artifact_label
+from dataset_store import get_dataset_info, load_dataset
+from explain import compute_shap_values, model_hash, summary_plot
+from dataset_profile import get_dataset_profile
 import os
 from pathlib import Path
 import numpy as np
 import seaborn as sns
 from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
-from scipy import stats
-import joblib
+
+def distribution_figure(profile, column, target_column):
+    """Build a per-class stacked histogram from precomputed profile counts."""
+    fig = go.Figure()
+    if column in profile["numeric_features"]:
+        i = profile["numeric_features"].index(column)
+        edges = profile["edges"][i]
+        centers = (edges[:-1] + edges[1:]) / 2
+        for k, label in enumerate(profile["classes"]):
+            fig.add_trace(go.Bar(x=centers, y=profile["counts"][i, k], width=np.diff(edges), name=label))
+    else:
+        table = profile["categorical"][column]
+        for k, label in enumerate(profile["classes"]):
+            fig.add_trace(go.Bar(x=table["values"], y=table["counts"][k], name=label))
+    fig.update_layout(barmode="stack", xaxis_title=column, yaxis_title="count", legend_title=target_column)
+    return fig
 
 def show():
     st.title("Model Visualization & Monitoring")
@@ -20,7 +37,7 @@ def show():
     models_dir = Path("models")
     datasets_dir = Path("datasets")
 
-    if not models_dir.exists() or not any(models_dir.glob("*.pkl")):
+    if not list_models(models_dir):
         st.warning("No trained models found. Please train a model first.")
         return
 
@@ -31,11 +48,13 @@ def show():
     # Sidebar for model and dataset selection
     with st.sidebar:
         st.subheader("Select Model & Dataset")
-        model_files = [f for f in models_dir.glob("*.pkl")]
+        show_versions = st.checkbox("Show all model versions")
+        model_labels = {m["path"]: artifact_label(m).title()
+                        for m in list_models(models_dir, all_versions=show_versions)}
         selected_model = st.selectbox(
             "Select Model",
-            options=[f.name for f in model_files],
-            format_func=lambda x: x.replace(".pkl", "").replace("_", " ").title()
+            options=list(model_labels),
+            format_func=model_labels.get
         )
 
         dataset_files = [f for f in datasets_dir.glob("*.csv")]
@@ -48,15 +67,18 @@ def show():
     if selected_model and selected_dataset:
         try:
             # Load model and dataset
-            model_data = joblib.load(models_dir / selected_model)
+            model_data = load_model_data(selected_model)
             model = model_data['model']
             feature_names = model_data['feature_names']
             target_column = model_data['target_column']
 
-            df = pd.read_csv(datasets_dir / selected_dataset)
+            # Only the columns the model needs are read from the columnar copy
+            dataset_info = get_dataset_info(datasets_dir / selected_dataset)
+            df = load_dataset(datasets_dir / selected_dataset, columns=feature_names + [target_column])
+            profile = get_dataset_profile(datasets_dir / selected_dataset, feature_names, target_column)
 
             # Get model information
-            model_info = get_model_info(models_dir / selected_model)
+            model_info = get_model_info(selected_model)
 
             # Main content
             st.subheader("Model Information")
@@ -65,8 +87,8 @@ def show():
                 st.write("Model Type:", model_info["type"])
                 st.write("Parameters:", model_info["parameters"])
             with col2:
-                st.write("Dataset Shape:", df.shape)
-                st.write("Features:", len(df.columns))
+                st.write("Dataset Shape:", tuple(dataset_info["shape"]))
+                st.write("Features:", len(dataset_info["columns"]))
 
             # Feature Importance
             if model_info["feature_importance"] is not None:
@@ -79,21 +101,32 @@ def show():
                 fig = px.bar(importance_df, x='Importance', y='Feature', orientation='h')
                 st.plotly_chart(fig)
 
-            # SHAP Values
+            # SHAP Values (computed on a bounded sample and persisted on disk)
             st.subheader("SHAP Values")
+            col1, col2 = st.columns(2)
+            with col1:
+                sample_size = st.slider("Rows to explain", 50, 5000, 500, 50)
+            with col2:
+                background_size = st.slider("Background rows", 10, 500, 100, 10)
             try:
                 X = df[feature_names]
-                explainer = shap.Explainer(model, X)
-                shap_values = explainer(X)
+                shap_values, X_sample, kind = compute_shap_values(
+                    model, X,
+                    model_key=model_hash(selected_model),
+                    dataset_key=dataset_info["content_hash"],
+                    sample_size=sample_size,
+                    background_size=background_size
+                )
+                st.caption(f"{kind.title()} explainer on {len(X_sample)} sampled rows")
 
                 # Summary plot
                 fig, ax = plt.subplots(figsize=(10, 6))
-                shap.summary_plot(shap_values, X, show=False)
+                summary_plot(shap_values, X_sample)
                 st.pyplot(fig)
 
                 # Bar plot
                 fig, ax = plt.subplots(figsize=(10, 6))
-                shap.summary_plot(shap_values, X, plot_type="bar", show=False)
+                summary_plot(shap_values, X_sample, plot_type="bar")
                 st.pyplot(fig)
             except Exception as e:
                 st.warning(f"Could not compute SHAP values: {str(e)}")
@@ -103,23 +136,22 @@ def show():
             col1, col2 = st.columns(2)
             with col1:
                 st.write("Missing Values:")
-                missing_values = df.isnull().sum()
+                missing_values = profile["missing"]
                 fig = px.bar(x=missing_values.index, y=missing_values.values)
                 st.plotly_chart(fig)
             with col2:
                 st.write("Data Types:")
-                st.write(df.dtypes)
+                st.write(pd.Series(dataset_info["dtypes"]))
 
-            # Feature Distributions
+            # Feature Distributions (rendered from the precomputed profile bins)
             st.subheader("Feature Distributions")
-            for column in feature_names:
-                fig = px.histogram(df, x=column, color=target_column, marginal="box")
-                st.plotly_chart(fig)
+            plot_features = st.multiselect("Features to plot", feature_names, default=feature_names[:10])
+            for column in plot_features:
+                st.plotly_chart(distribution_figure(profile, column, target_column))
 
             # Correlation Matrix
             st.subheader("Feature Correlation Matrix")
-            corr_matrix = df[feature_names + [target_column]].corr()
-            fig = px.imshow(corr_matrix, color_continuous_scale="RdBu")
+            fig = px.imshow(profile["corr"], color_continuous_scale="RdBu")
             st.plotly_chart(fig)
 
             # Model Performance Metrics
@@ -154,12 +186,9 @@ def show():
 
             # Statistical Tests
             st.subheader("Statistical Analysis")
-            for column in feature_names:
-                if df[column].dtype in ['int64', 'float64']:
-                    # Perform t-test between feature and target
-                    t_stat, p_value = stats.ttest_ind(df[df[target_column] == 0][column],
-                                                    df[df[target_column] == 1][column])
-                    st.write(f"{column}: t-statistic = {t_stat:.4f}, p-value = {p_value:.4f}")
+            if profile["ttest"] is not None:
+                for column, row in profile["ttest"].iterrows():
+                    st.write(f"{column}: t-statistic = {row['t_statistic']:.4f}, p-value = {row['p_value']:.4f}")
 
         except Exception as e:
             st.error(f"Error processing model and data: {str(e)}")
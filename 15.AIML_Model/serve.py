@@ -0,0 +1,379 @@
+"""Low-latency HTTP inference service for models saved by train_and_save_model.
+
+Models are loaded once at startup. Single-row JSON requests that arrive
+within BATCH_WINDOW_MS of each other are micro-batched into one vectorized
+model.predict call; CSV and Arrow bodies are streamed and scored in chunks.
+
+Run with:  python serve.py  (listens on 0.0.0.0:$PORT, default 8000)
+"""
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from aiohttp import web
+
+from model_store import artifact_label
+from utils import list_models, load_model_data, predict
+
+MODELS_DIR = os.environ.get("MODELS_DIR", "models")
+PORT = int(os.environ.get("PORT", 8000))
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", 5))
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 1024))
+
+# Largest JSON body accepted; batch bodies are streamed and have no size limit
+MAX_JSON_BYTES = int(os.environ.get("MAX_JSON_BYTES", 16 * 1024 * 1024))
+
+# Bytes of an uploaded CSV parsed (and scored) at a time, and of an Arrow upload kept in RAM before spilling to disk
+CHUNK_BYTES = int(os.environ.get("CHUNK_BYTES", 16 * 1024 * 1024))
+
+# Errors raised by model.predict for values it cannot use (e.g. "abc" in a numeric feature)
+SCORING_ERRORS = (ValueError, TypeError)
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+class Metrics:
+    """Rolling request latency percentiles and throughput."""
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.started_at = time.time()
+        self.requests = 0
+        self.rows = 0
+
+    def record(self, latency_s, rows):
+        self.latencies.append(latency_s)
+        self.requests += 1
+        self.rows += rows
+
+    def summary(self):
+        latencies_ms = 1000 * np.array(self.latencies) if self.latencies else np.zeros(1)
+        uptime = time.time() - self.started_at
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "requests_per_s": self.requests / uptime,
+            "rows_per_s": self.rows / uptime,
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row requests into vectorized predict calls."""
+
+    def __init__(self, model, feature_names, metrics):
+        self.model = model
+        self.feature_names = feature_names
+        self.metrics = metrics
+        self.queue = asyncio.Queue()
+        self.closed = False
+        self.task = asyncio.create_task(self._run())
+
+    async def submit(self, row):
+        if self.closed:
+            raise web.HTTPServiceUnavailable(text="Model is being reloaded, retry the request")
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((row, future))
+        return await future
+
+    async def close(self):
+        """Stop accepting rows and return once every queued row has been scored."""
+        self.closed = True
+        self.queue.put_nowait(None)
+        await self.task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + BATCH_WINDOW_MS / 1000
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self.metrics.batch_sizes.append(len(batch))
+            await self._score(batch)
+
+    async def _score(self, batch):
+        loop = asyncio.get_running_loop()
+        rows, futures = zip(*batch)
+        try:
+            df = pd.DataFrame(list(rows), columns=self.feature_names)
+            predictions = await loop.run_in_executor(None, predict, self.model, df)
+        except Exception as e:
+            if len(batch) == 1:
+                if not futures[0].done():
+                    futures[0].set_exception(e)
+                return
+            # One bad row fails the whole vectorized call; score rows one by one so only it fails
+            for item in batch:
+                await self._score([item])
+            return
+        for future, value in zip(futures, predictions.tolist()):
+            if not future.done():
+                future.set_result(value)
+
+
+def _load_models(app):
+    """Load the latest version of every saved model."""
+    models = {}
+    for artifact in list_models(MODELS_DIR):
+        # Versioned artifacts are listed first and win over a same-named legacy .pkl
+        if artifact["name"] in models:
+            continue
+        model_data = load_model_data(artifact["path"])
+        models[artifact["name"]] = {
+            "label": artifact_label(artifact),
+            "version": artifact["version"],
+            "model": model_data["model"],
+            "feature_names": model_data["feature_names"],
+            "target_column": model_data["target_column"],
+            "batcher": MicroBatcher(model_data["model"], model_data["feature_names"], app["metrics"]),
+        }
+    return models
+
+
+def _get_model(request):
+    name = request.match_info["name"]
+    entry = request.app["models"].get(name)
+    if entry is None:
+        raise web.HTTPNotFound(text=f"Unknown model: {name}")
+    return entry
+
+
+def _check_features(entry, columns):
+    missing_features = [f for f in entry["feature_names"] if f not in columns]
+    if missing_features:
+        raise web.HTTPBadRequest(text=f"Missing required features: {missing_features}")
+
+
+async def health(request):
+    return web.json_response({"status": "ok", "models": len(request.app["models"])})
+
+
+async def list_models_handler(request):
+    return web.json_response([
+        {"name": name, "label": entry["label"], "version": entry["version"],
+         "feature_names": entry["feature_names"], "target_column": entry["target_column"]}
+        for name, entry in request.app["models"].items()
+    ])
+
+
+async def predict_json(request):
+    """Score {"instances": [{feature: value}, ...]} or a single {feature: value} object."""
+    start = time.perf_counter()
+    entry = _get_model(request)
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise web.HTTPBadRequest(text=f"Invalid JSON: {e}")
+    instances = body["instances"] if isinstance(body, dict) and "instances" in body else [body]
+    if not isinstance(instances, list) or not instances:
+        raise web.HTTPBadRequest(text='"instances" must be a non-empty list of objects')
+    for instance in instances:
+        if not isinstance(instance, dict):
+            raise web.HTTPBadRequest(text=f"Each instance must be a {{feature: value}} object, got {instance!r}")
+        _check_features(entry, instance)
+
+    try:
+        if len(instances) == 1:
+            predictions = [await entry["batcher"].submit(instances[0])]
+        else:
+            df = pd.DataFrame(instances, columns=entry["feature_names"])
+            loop = asyncio.get_running_loop()
+            predictions = (await loop.run_in_executor(None, predict, entry["model"], df)).tolist()
+    except SCORING_ERRORS as e:
+        raise web.HTTPBadRequest(text=f"Could not score the request: {e}")
+
+    request.app["metrics"].record(time.perf_counter() - start, len(instances))
+    return web.json_response({"predictions": predictions})
+
+
+def _parse_csv(data):
+    return pd.read_csv(io.BytesIO(data))
+
+
+def _next_frame(reader):
+    try:
+        return reader.read_next_batch().to_pandas()
+    except StopIteration:
+        return None
+
+
+async def _csv_chunks(content):
+    """Parse a streamed CSV body into DataFrames of about CHUNK_BYTES each, as it arrives.
+
+    Chunks are cut at line breaks, so quoted fields must not contain newlines.
+    Parsing runs in the executor so that single-row requests are not blocked.
+    """
+    loop = asyncio.get_running_loop()
+    header = None
+    buffer = bytearray()
+    async for data in content.iter_chunked(1024 * 1024):
+        buffer += data
+        if header is None:
+            end = buffer.find(b"\n")
+            if end < 0:
+                continue
+            header = bytes(buffer[:end + 1])
+            del buffer[:end + 1]
+        if len(buffer) >= CHUNK_BYTES:
+            end = buffer.rfind(b"\n")
+            if end >= 0:
+                yield await loop.run_in_executor(None, _parse_csv, header + buffer[:end + 1])
+                del buffer[:end + 1]
+    if header is None:
+        if not buffer.strip():
+            return
+        header, buffer = bytes(buffer) + b"\n", bytearray()
+    # Header only: an empty frame still carries the column names
+    yield await loop.run_in_executor(None, _parse_csv, header + buffer)
+
+
+async def _arrow_chunks(content):
+    """Read a streamed Arrow IPC body batch by batch.
+
+    The body is spooled to a temporary file (in memory up to CHUNK_BYTES) so
+    that it never has to fit in RAM. Batches are decoded in the executor.
+    """
+    loop = asyncio.get_running_loop()
+    with tempfile.SpooledTemporaryFile(max_size=CHUNK_BYTES) as spool:
+        async for data in content.iter_chunked(1024 * 1024):
+            spool.write(data)
+        if not spool.tell():
+            return
+        spool.seek(0)
+        reader = await loop.run_in_executor(None, pa.ipc.open_stream, spool)
+        while (frame := await loop.run_in_executor(None, _next_frame, reader)) is not None:
+            yield frame
+
+
+async def predict_batch(request):
+    """Score a CSV or Arrow IPC stream body and return it with a Predictions column."""
+    start = time.perf_counter()
+    entry = _get_model(request)
+    feature_names = entry["feature_names"]
+    is_arrow = request.content_type == ARROW_STREAM
+    loop = asyncio.get_running_loop()
+
+    # The body is read incrementally, so it is not bounded by client_max_size
+    chunks = _arrow_chunks(request.content) if is_arrow else _csv_chunks(request.content)
+
+    # Validate the first chunk before any response headers are sent
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        raise web.HTTPBadRequest(text="Empty request body")
+    except (pa.ArrowInvalid, pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise web.HTTPBadRequest(text=f"Could not parse the request body: {e}")
+    _check_features(entry, first.columns)
+    try:
+        first_predictions = await loop.run_in_executor(None, predict, entry["model"], first[feature_names])
+    except SCORING_ERRORS as e:
+        raise web.HTTPBadRequest(text=f"Could not score the request: {e}")
+
+    response = web.StreamResponse(headers={"Content-Type": ARROW_STREAM if is_arrow else "text/csv"})
+    await response.prepare(request)
+
+    async def scored_chunks():
+        yield first[feature_names], first_predictions
+        async for chunk in chunks:
+            # The status is already sent, so a bad later chunk can only abort the response
+            _check_features(entry, chunk.columns)
+            chunk = chunk[feature_names]
+            yield chunk, await loop.run_in_executor(None, predict, entry["model"], chunk)
+
+    writer = None
+    sink = io.BytesIO()
+
+    def encode(chunk, predictions, first_chunk):
+        # Runs in the executor: serializing a large chunk would block the event loop
+        nonlocal writer
+        result = chunk.assign(Predictions=predictions)
+        if is_arrow:
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, table.schema)
+            writer.write_table(table)
+        else:
+            result.to_csv(sink, header=first_chunk, index=False)
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    rows = 0
+    async for chunk, predictions in scored_chunks():
+        # Flush each scored chunk to the client as soon as it is ready
+        await response.write(await loop.run_in_executor(None, encode, chunk, predictions, rows == 0))
+        rows += len(chunk)
+
+    if writer is not None:
+        writer.close()
+        await response.write(sink.getvalue())
+    await response.write_eof()
+
+    request.app["metrics"].record(time.perf_counter() - start, rows)
+    return response
+
+
+async def metrics_handler(request):
+    return web.json_response(request.app["metrics"].summary())
+
+
+async def reload_models(request):
+    models = request.app["models"]
+    old_entries = list(models.values())
+    new_models = _load_models(request.app)
+    # Swap in place: requests arriving from now on use the new models
+    models.clear()
+    models.update(new_models)
+    # Rows already queued on the old batchers are still scored by the old models
+    await asyncio.gather(*(entry["batcher"].close() for entry in old_entries))
+    return web.json_response({"models": list(models)})
+
+
+async def _on_startup(app):
+    app["models"].update(_load_models(app))
+
+
+def create_app():
+    app = web.Application(client_max_size=MAX_JSON_BYTES)
+    app["metrics"] = Metrics()
+    # Mutable container, filled at startup and updated in place by /models/reload
+    app["models"] = {}
+    app.on_startup.append(_on_startup)
+    app.router.add_get("/health", health)
+    app.router.add_get("/models", list_models_handler)
+    app.router.add_post("/models/reload", reload_models)
+    app.router.add_post("/models/{name}/predict", predict_json)
+    app.router.add_post("/models/{name}/predict/batch", predict_batch)
+    app.router.add_get("/metrics", metrics_handler)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host="0.0.0.0", port=PORT)
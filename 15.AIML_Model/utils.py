@@ -1,5 +1,4 @@
 import pandas as pd
-import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
@@ -7,7 +6,14 @@ from sklearn.svm import SVC
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score
 import numpy as np
-from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import itertools
+import threading
+import time
+
+import model_store
 
 MODELS = {
     "Logistic Regression": LogisticRegression,
@@ -18,16 +24,146 @@ MODELS = {
 
 import os
 
-def train_and_save_model(df, target_column, model_name, test_size=0.2, random_state=42):
+# Upper bound for the in-memory model cache, measured in bytes of model
+# payloads on disk (a cheap proxy for the unpickled estimator size).
+MODEL_CACHE_MAX_BYTES = int(os.environ.get("MODEL_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+class ModelCache:
+    """Process-wide LRU cache of unpickled model artifacts.
+
+    Entries are keyed by the resolved payload path together with the file's
+    mtime and size, so a model rewritten on disk is never served stale.
+    Streamlit runs every session in its own thread, hence the lock.
+    """
+
+    def __init__(self, max_bytes=MODEL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(model_path):
+        path = model_store.payload_path(model_path).resolve()
+        stat = path.stat()
+        return str(path), stat.st_mtime_ns, stat.st_size
+
+    def get(self, model_path):
+        """Return the artifact dict for model_path, loading it on a miss."""
+        key = self._key(model_path)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        model_data = model_store.load_artifact(model_path)
+
+        with self._lock:
+            # Drop older versions of the same file before inserting
+            self._discard(key[0])
+            self._entries[key] = model_data
+            self.current_bytes += key[2]
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, _ = self._entries.popitem(last=False)
+                self.current_bytes -= old_key[2]
+                self.evictions += 1
+        return model_data
+
+    def _discard(self, path):
+        for key in [k for k in self._entries if k[0] == path]:
+            del self._entries[key]
+            self.current_bytes -= key[2]
+
+    def invalidate(self, model_path=None):
+        """Forget one model (or every model when model_path is None)."""
+        with self._lock:
+            if model_path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            else:
+                self._discard(str(model_store.payload_path(model_path).resolve()))
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_model_cache = ModelCache()
+
+
+# Models whose fit is multi-threaded through an n_jobs parameter
+N_JOBS_MODELS = {"Random Forest", "XGBoost"}
+
+# Default hyperparameter grid used by the sweep on the Train Models page
+DEFAULT_PARAM_GRID = {
+    "Logistic Regression": {"C": [0.1, 1.0, 10.0]},
+    "Random Forest": {"n_estimators": [50, 100, 200], "max_depth": [5, 10]},
+    "SVM": {"kernel": ["rbf", "linear"], "C": [0.1, 1.0, 10.0]},
+    "XGBoost": {"n_estimators": [50, 100, 200], "learning_rate": [0.05, 0.1, 0.3]}
+}
+
+def build_model(model_name, params=None, n_jobs=None):
+    """Instantiate a model from MODELS, applying n_jobs where the model supports it."""
+    params = dict(params or {})
+    if n_jobs is not None and model_name in N_JOBS_MODELS:
+        params.setdefault("n_jobs", n_jobs)
+    return MODELS[model_name](**params)
+
+def _feature_importance(model):
+    """Return feature importances (or absolute coefficients) if the model exposes them."""
+    if hasattr(model, 'feature_importances_'):
+        return model.feature_importances_
+    elif hasattr(model, 'coef_'):
+        return np.abs(model.coef_[0])
+    return None
+
+def dataset_hash(df):
+    """Return a content hash of a DataFrame (values and column names)."""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(repr(df.columns.tolist()).encode())
+    return digest.hexdigest()
+
+def save_model(model, model_name, feature_names, target_column, random_state=42, suffix="",
+               metrics=None, timings=None, training_data_hash=None):
+    """Save a model as a new artifact version and return the version directory."""
+    name = f"{model_name.replace(' ', '_')}_{random_state}{suffix}"
+    version_dir = model_store.write_artifact(
+        model, name, feature_names, target_column,
+        metrics=metrics, timings=timings, training_data_hash=training_data_hash
+    )
+    return str(version_dir)
+
+def train_and_save_model(df, target_column, model_name, test_size=0.2, random_state=42,
+                         params=None, n_jobs=None):
     """
     Train a model and save it to disk.
 
+    The model is written as a new version directory, so nothing has to be
+    invalidated: ModelCache keys entries by path, mtime and size, and a model
+    that has been saved before is never served stale.
+
     Args:
         df: DataFrame containing the data
         target_column: Name of the target column
         model_name: Name of the model to train
         test_size: Proportion of data to use for testing
         random_state: Random seed for reproducibility
+        params: Hyperparameters passed to the model constructor
+        n_jobs: Threads for models that support it (Random Forest, XGBoost)
 
     Returns:
         tuple: (accuracy, model_path, y_test, y_pred, feature_importance)
@@ -38,49 +174,220 @@ def train_and_save_model(df, target_column, model_name, test_size=0.2, random_st
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
 
     # Initialize and train model
-    model_class = MODELS[model_name]
-    model = model_class()
+    model = build_model(model_name, params, n_jobs)
+    start = time.perf_counter()
     model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
 
     # Make predictions
+    start = time.perf_counter()
     y_pred = model.predict(X_test)
+    predict_time = time.perf_counter() - start
     accuracy = accuracy_score(y_test, y_pred)
 
     # Get feature importance if available
-    feature_importance = None
-    if hasattr(model, 'feature_importances_'):
-        feature_importance = model.feature_importances_
-    elif hasattr(model, 'coef_'):
-        feature_importance = np.abs(model.coef_[0])
+    feature_importance = _feature_importance(model)
 
     # Save model and feature names
-    models_dir = Path("models")
-    models_dir.mkdir(exist_ok=True)
-    model_filename = f"models/{model_name.replace(' ', '_')}_{random_state}.pkl"
-
-    # Create a dictionary containing both the model and feature names
-    model_data = {
-        'model': model,
-        'feature_names': X.columns.tolist(),
-        'target_column': target_column
+    model_path = save_model(
+        model, model_name, X.columns, target_column, random_state,
+        metrics={"accuracy": accuracy, "test_size": test_size},
+        timings={"fit_s": fit_time, "predict_s": predict_time},
+        training_data_hash=dataset_hash(df)
+    )
+
+    return accuracy, model_path, y_test, y_pred, feature_importance
+
+def expand_param_grid(param_grid):
+    """Expand {param: [values]} into a list of parameter dicts (cartesian product)."""
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+# Train/test split shared by every run inside one sweep worker process
+_sweep_data = {}
+
+def _init_sweep_worker(X_train, X_test, y_train, y_test):
+    _sweep_data.update(X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test)
+
+def _sweep_suffix(params):
+    return "_" + hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()[:8]
+
+def _save_sweep_model(model, result, feature_names, target_column, random_state, test_size, data_hash):
+    return save_model(
+        model, result["model"], feature_names, target_column, random_state, _sweep_suffix(result["params"]),
+        metrics={"accuracy": result["accuracy"], "test_size": test_size},
+        timings={"fit_s": result["fit_time_s"], "predict_s": result["predict_latency_ms"] / 1000},
+        training_data_hash=data_hash
+    )
+
+def _build_sweep_model(model_name, params, n_jobs, random_state):
+    # Seeded so that refitting a run reproduces the model that was scored
+    return build_model(model_name, {"random_state": random_state, **params}, n_jobs)
+
+def _run_sweep_trial(model_name, params, n_jobs, random_state, save_kwargs=None):
+    """Fit and score one run; with save_kwargs the model is saved here and only its path is returned."""
+    model = _build_sweep_model(model_name, params, n_jobs, random_state)
+
+    start = time.perf_counter()
+    model.fit(_sweep_data["X_train"], _sweep_data["y_train"])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(_sweep_data["X_test"])
+    predict_time = time.perf_counter() - start
+
+    result = {
+        "model": model_name,
+        "params": params,
+        "accuracy": accuracy_score(_sweep_data["y_test"], y_pred),
+        "fit_time_s": fit_time,
+        "predict_latency_ms": 1000 * predict_time,
+        "predict_us_per_row": 1e6 * predict_time / max(len(y_pred), 1),
+        "model_path": None,
     }
+    if save_kwargs is not None:
+        result["model_path"] = _save_sweep_model(model, result, **save_kwargs)
+    return result
+
+def run_sweep(df, target_column, param_grids, test_size=0.2, random_state=42,
+              max_workers=None, save="best"):
+    """
+    Train every model/parameter combination in parallel and rank them.
+
+    Runs are fanned out over a process pool. Models that are themselves
+    multi-threaded (see N_JOBS_MODELS) get n_jobs = cpu_count // max_workers
+    so the pool does not oversubscribe the machine's cores.
+
+    Args:
+        df: DataFrame containing the data
+        target_column: Name of the target column
+        param_grids: {model_name: {param: [values]}} with model names from MODELS
+        test_size: Proportion of data to use for testing
+        random_state: Random seed for the split and the models (and the saved file names)
+        max_workers: Number of worker processes (defaults to the CPU count)
+        save: "best" to save the top run, "all" to save every run, "none" to save nothing
+
+    Returns:
+        DataFrame: Leaderboard sorted by accuracy with fit time, predict latency
+        and the saved model path (if any) for every run
+    """
+    if save not in ("best", "all", "none"):
+        raise ValueError(f"save must be 'best', 'all' or 'none', got {save!r}")
+
+    X = df.drop(columns=[target_column])
+    y = df[target_column]
+    split = train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    trials = [(model_name, params)
+              for model_name, grid in param_grids.items()
+              for params in expand_param_grid(grid)]
+    cpu_count = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers or cpu_count, len(trials) or 1))
+    n_jobs = max(1, cpu_count // max_workers)
+
+    # Fitted models never travel back from the workers: with save="all" each
+    # worker saves its own model, with save="best" the winner is refit below
+    save_kwargs = None
+    if save != "none":
+        save_kwargs = dict(feature_names=X.columns, target_column=target_column, random_state=random_state,
+                           test_size=test_size, data_hash=dataset_hash(df))
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=split) as pool:
+        futures = [pool.submit(_run_sweep_trial, model_name, params, n_jobs, random_state,
+                               save_kwargs if save == "all" else None)
+                   for model_name, params in trials]
+        rows = [future.result() for future in futures]
+    rows.sort(key=lambda result: result["accuracy"], reverse=True)
 
-    joblib.dump(model_data, model_filename)
+    if save == "best" and rows:
+        best = rows[0]
+        X_train, _, y_train, _ = split
+        model = _build_sweep_model(best["model"], best["params"], cpu_count, random_state)
+        model.fit(X_train, y_train)
+        best["model_path"] = _save_sweep_model(model, best, **save_kwargs)
 
-    return accuracy, model_filename, y_test, y_pred, feature_importance
+    return pd.DataFrame(rows)
+
+def load_model_data(model_path):
+    """Load a saved model dictionary (model, feature_names, target_column) through the shared cache."""
+    return _model_cache.get(model_path)
 
 def load_model(model_path):
     """Load a trained model from disk."""
-    model_data = joblib.load(model_path)
-    return model_data['model']
+    return load_model_data(model_path)['model']
+
+def invalidate_model_cache(model_path=None):
+    """Drop a model (or all models) from the shared cache."""
+    _model_cache.invalidate(model_path)
+
+def model_cache_stats():
+    """Return hit/miss/eviction counters of the shared model cache."""
+    return _model_cache.stats()
 
 def predict(model, df):
     """Make predictions using a trained model."""
     return model.predict(df)
 
+def predict_in_chunks(model, chunks, feature_names, output_path, progress_callback=None):
+    """
+    Score an iterable of DataFrame chunks and stream the results to a CSV file.
+
+    Only one chunk is held in memory at a time, so peak memory is bounded by
+    the chunk size rather than by the size of the input.
+
+    Args:
+        model: Trained model
+        chunks: Iterable of DataFrames, e.g. pd.read_csv(..., chunksize=n)
+        feature_names: Features the model was trained on, in training order
+        output_path: CSV file the features and predictions are written to
+        progress_callback: Optional callable(rows_done, elapsed_seconds)
+
+    Returns:
+        tuple: (rows_scored, elapsed_seconds)
+    """
+    start = time.perf_counter()
+    rows_done = 0
+    with open(output_path, "w", newline="", encoding="utf-8") as out:
+        for i, chunk in enumerate(chunks):
+            missing_features = [f for f in feature_names if f not in chunk.columns]
+            if missing_features:
+                raise ValueError(f"Missing required features: {missing_features}")
+
+            # Select only the required features in the correct order
+            chunk = chunk[feature_names]
+            result = chunk.assign(Predictions=predict(model, chunk))
+            result.to_csv(out, header=(i == 0), index=False)
+
+            rows_done += len(chunk)
+            if progress_callback is not None:
+                progress_callback(rows_done, time.perf_counter() - start)
+
+    return rows_done, time.perf_counter() - start
+
+def list_models(models_dir="models", all_versions=False):
+    """List saved models from their manifests, without loading any estimator."""
+    return model_store.list_artifacts(models_dir, all_versions)
+
 def get_model_info(model_path):
     """Get information about a trained model."""
-    model_data = joblib.load(model_path)
+    if not model_store.is_legacy(model_path):
+        # Served from the manifest alone; the estimator is not unpickled
+        manifest = model_store.read_manifest(model_path)
+        importance = manifest["feature_importance"]
+        return {
+            "type": manifest["type"],
+            "parameters": manifest["params"],
+            "feature_importance": None if importance is None else np.array(importance),
+            "feature_names": manifest["feature_names"],
+            "target_column": manifest["target_column"],
+            "version": manifest["version"],
+            "metrics": manifest["metrics"],
+            "timings": manifest["timings"],
+            "training_data_hash": manifest["training_data_hash"],
+            "payload_size": manifest["payload_size"]
+        }
+
+    model_data = load_model_data(model_path)
     model = model_data['model']
     feature_names = model_data['feature_names']
     target_column = model_data['target_column']
@@ -88,14 +395,9 @@ def get_model_info(model_path):
     info = {
         "type": type(model).__name__,
         "parameters": model.get_params(),
-        "feature_importance": None,
+        "feature_importance": _feature_importance(model),
         "feature_names": feature_names,
         "target_column": target_column
     }
 
-    if hasattr(model, 'feature_importances_'):
-        info["feature_importance"] = model.feature_importances_
-    elif hasattr(model, 'coef_'):
-        info["feature_importance"] = np.abs(model.coef_[0])
-
     return info